@@ -1,35 +1,114 @@
 import search
+import util
+import solutioncache
+import sharedtables
 import csv
+import itertools
+import mmap
+import os
+import struct
+import time
 import concurrent.futures
 from fifteenpuzzle import (
     createRandomFifteenPuzzle,
     FifteenPuzzleState,
+    GOAL_NUMBERS,
+    packNumbers,
     is_solvable,
+    is_solvable_batch,
     FifteenPuzzleSearchProblem,
+    incrementalH3,
+    boardsFromPacked,
+    h3Batch,
     h1,
     h2,
     h3,
     h4,
+    h6,
 )
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
-def read_puzzles_from_csv(filename="scenarios.csv"):
-    puzzles = []
-    with open(filename, mode="r") as file:
+
+TILES = set(range(16))
+RESULT_HEADER = ["Puzzle", "Result", "Depth", "Expanded Nodes", "Max Fringe Size", "Time"]
+
+
+def _parse_tiles(row):
+    """Returns the 16 tiles of a CSV row, in either scenario layout, or None if it is not a board."""
+    if len(row) == 1:
+        row = row[0].split()
+    try:
+        tiles = [int(cell) for cell in row]
+    except ValueError:
+        return None
+    return tiles
+
+
+def iter_puzzles_from_csv(filename="scenarios.csv"):
+    """
+    Lazily yields the packed board of every scenario in a CSV file. Both
+    layouts are accepted: one column of space-separated tiles (as in the
+    shipped scenarios.csv) or sixteen comma-separated columns. A leading
+    header row is skipped. Rows that are not a permutation of 0-15 raise
+    ValueError naming the line.
+    """
+    with open(filename, mode="r", newline="") as file:
         reader = csv.reader(file)
-        next(reader)  # Skip header
         for row in reader:
-            puzzle = list(map(int, row))
-            puzzles.append(FifteenPuzzleState(puzzle))
-    return puzzles
+            if not row:
+                continue
+            tiles = _parse_tiles(row)
+            if tiles is None and reader.line_num == 1:
+                continue  # Header
+            if tiles is None or len(tiles) != 16 or set(tiles) != TILES:
+                raise ValueError(f"{filename}:{reader.line_num}: not a 15-puzzle board: {row}")
+            yield packNumbers(tiles)
+
+
+def read_puzzles_from_csv(filename="scenarios.csv"):
+    return [FifteenPuzzleState.fromPacked(packed) for packed in iter_puzzles_from_csv(filename)]
+
+
+class ResultWriter:
+    """
+    Appends (index, result) rows to a results CSV as they arrive. Rows are
+    buffered and flushed to the operating system every flush_every rows and
+    on close, so a crash loses at most that many results.
+    """
+
+    def __init__(self, filename="results.csv", flush_every=64):
+        self.file = open(filename, mode="w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(RESULT_HEADER)
+        self.flush_every = flush_every
+        self.unflushed = 0
+
+    def write(self, index, result):
+        self.writer.writerow((index,) + tuple(result))
+        self.unflushed += 1
+        if self.unflushed >= self.flush_every:
+            self.file.flush()
+            self.unflushed = 0
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
 
 def write_results_to_csv(results, filename="results.csv"):
-    with open(filename, mode="w", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerow(["Result", "Depth", "Expanded Nodes", "Max Fringe Size"])  # Write header
-        for result in results:
-            writer.writerow(result)
+    """Writes (index, result) pairs, as yielded by solve_batch, to a results CSV with RESULT_HEADER."""
+    with ResultWriter(filename) as writer:
+        for index, result in results:
+            writer.write(index, result)
 
 
 def generate_random_puzzles(num_puzzles=500):
@@ -42,15 +121,123 @@ def generate_random_puzzles(num_puzzles=500):
     return puzzles
 
 
-def solve_puzzle(puzzle):
-    if is_solvable(puzzle):
-        problem = FifteenPuzzleSearchProblem(puzzle)
-        
-        # Run the search and capture additional metrics
-        path, expanded_nodes, max_fringe_size = search.aStarSearch(problem, h1)
-        depth_of_solution = len(path)
-        
+# Puzzles whose Manhattan distance exceeds this are solved with IDA*, whose
+# memory stays linear in the solution depth, instead of A*. On random boards
+# with a Manhattan distance up to 16, A* with Manhattan distance expanded at
+# most about 2,000 nodes; from 18 on, boards needing 26 or more moves took
+# from a few thousand to over 10^5, where IDA* with linear conflicts is about
+# as fast and needs no memory per node.
+IDA_STAR_THRESHOLD = 16
+
+
+def choose_search(puzzle):
+    """Returns the (search function, heuristic) pair to solve a puzzle with."""
+    if h3(puzzle) > IDA_STAR_THRESHOLD:
+        return search.idaStarSearch, h6
+    return search.aStarSearch, incrementalH3
+
+
+# Every heuristic choose_search can pick. Batch runs evaluate them before
+# starting their pool, so the table h6 reads is built once and shared.
+SEARCH_HEURISTICS = (incrementalH3, h6)
+
+
+# Bounded-suboptimal modes for per-puzzle latency targets, tightest first:
+# (latency target up to, search function, suboptimality bound). Puzzles
+# with a longer target, or none, are solved optimally by choose_search.
+# Every mode runs with the target as its deadline. On 300-move random walks
+# weighted A* at w=3 found its path within 0.1s for 14 boards in 20, sooner
+# than the first pass of ARA* at the same weight (9 in 20). ARA* had a path
+# within 1s for 19 in 20 and within 10s for all, and keeps the best one when
+# the deadline stops it before the bound is proven; it proved 7 in 20
+# optimal within 10s.
+LATENCY_MODES = [
+    (0.1, search.weightedAStarSearch, 3),
+    (1.0, search.anytimeRepairingAStarSearch, 1.5),
+    (10.0, search.anytimeRepairingAStarSearch, 1),
+]
+
+
+def choose_mode(puzzle, latency_target=None):
+    """
+    Returns (search function, heuristic, suboptimality bound) for a puzzle
+    that should be answered within latency_target seconds. The bounded modes
+    take their bound as a keyword; a bound of 1 means optimal.
+    """
+    if latency_target is not None:
+        for target, algorithm, bound in LATENCY_MODES:
+            if latency_target <= target:
+                return algorithm, incrementalH3, bound
+    algorithm, heuristic = choose_search(puzzle)
+    return algorithm, heuristic, 1
+
+
+# Default per-puzzle budgets for batch runs; None means unlimited.
+PUZZLE_TIME_LIMIT = 60.0  # seconds of wall-clock time
+PUZZLE_NODE_LIMIT = None  # node expansions
+
+
+def run_search(puzzle, time_limit=None, node_limit=None, cache=None, latency_target=None):
+    """
+    Solves a solvable puzzle within optional wall-clock and expansion
+    budgets and returns (result, depth, expanded nodes, max fringe size).
+    A puzzle that runs out of budget reports how far it got instead.
+    Given a solutioncache.SolutionCache, a cached solution is returned
+    without searching, and new optimal solutions are added to it.
+
+    With a latency_target in seconds the search mode comes from
+    LATENCY_MODES and the path may be longer than optimal, by at most the
+    factor the result names. The target also caps time_limit, whatever the
+    mode; the anytime mode then returns its best path so far.
+    """
+    if cache is not None:
+        path = cache.get(puzzle)
+        if path is not None:
+            return (f"cache hit: path of {len(path)} moves", len(path), 0, 0)
+
+    algorithm, heuristic, bound = choose_mode(puzzle, latency_target)
+    if latency_target is not None:
+        time_limit = latency_target if time_limit is None else min(time_limit, latency_target)
+    problem = FifteenPuzzleSearchProblem(puzzle)
+    if time_limit is not None or node_limit is not None:
+        problem = search.BudgetedSearchProblem(problem, time_limit, node_limit)
+
+    # Run the search and capture additional metrics. suboptimality is the
+    # proven factor by which the path may exceed the optimum: the mode's bound,
+    # or for the anytime mode that of the last path it reported.
+    suboptimality = bound
+    try:
+        if algorithm is search.anytimeRepairingAStarSearch:
+            stats = search.SearchStats()
+            path = None
+            try:
+                for path, cost, suboptimality in algorithm(problem, heuristic, bound=bound, stats=stats):
+                    pass
+            except (util.NodeLimitException, util.TimeoutFunctionException):
+                if path is None:
+                    raise
+            expanded_nodes, max_fringe_size = stats.expanded, stats.maxFringeSize
+        elif bound != 1:
+            path, expanded_nodes, max_fringe_size = algorithm(problem, heuristic, bound=bound)
+        else:
+            path, expanded_nodes, max_fringe_size = algorithm(problem, heuristic)
+    except util.NodeLimitException:
+        return ("node limit reached", None, problem.expanded, None)
+    except util.TimeoutFunctionException:
+        return ("timed out", None, problem.expanded, None)
+    depth_of_solution = len(path)
+    if suboptimality == 1:  # only proven optimal paths are cached
+        if cache is not None:
+            cache.put(puzzle, path)
         result = f"A* found a path of {depth_of_solution} moves"
+    else:
+        result = f"A* found a path of {depth_of_solution} moves within {suboptimality:.2g}x optimal"
+    return (result, depth_of_solution, expanded_nodes, max_fringe_size)
+
+
+def solve_puzzle(puzzle, cache=None):
+    if is_solvable(puzzle):
+        result = run_search(puzzle, cache=cache)
         
         misplaced_tiles = h1(puzzle)
         print(f"Heuristic 1 gives: {misplaced_tiles}")
@@ -67,12 +254,390 @@ def solve_puzzle(puzzle):
         out_of_row, out_of_column = h4(puzzle)
         print(f"Heuristic 4 gives: {out_of_row + out_of_column}")
         
-        return (result, depth_of_solution, expanded_nodes, max_fringe_size)
+        return result
     else:
         result = "not solvable"
         return (result, None, None, None)
 
 
+_worker_cache = None
+
+
+def init_worker(heuristics=(), cache_filename=None, tables=None):
+    """
+    Pool initializer: attaches the shared tables published by the parent
+    (a sharedtables manifest), evaluates each heuristic once on the goal so
+    that any other tables it builds or maps are ready before the worker's
+    first puzzle, and opens the worker's connection to the solution cache,
+    if one is used.
+    """
+    global _worker_cache
+    if tables:
+        sharedtables.attachTables(tables)
+    goal = FifteenPuzzleState(GOAL_NUMBERS)
+    for heuristic in heuristics:
+        heuristic(goal)
+    if cache_filename is not None:
+        _worker_cache = solutioncache.SolutionCache(cache_filename)
+
+
+def solve_chunk(chunk, time_limit=None, node_limit=None):
+    """
+    Solves a list of (index, packed board, latency target) triples and
+    returns (index, result) pairs, each result ending with the seconds spent
+    on that puzzle. A latency target of None asks for an optimal path.
+    """
+    results = []
+    for index, packed, latency_target in chunk:
+        start = time.perf_counter()
+        puzzle = FifteenPuzzleState.fromPacked(packed)
+        if is_solvable(puzzle):
+            result = run_search(puzzle, time_limit, node_limit, _worker_cache, latency_target)
+        else:
+            result = ("not solvable", None, None, None)
+        results.append((index, result + (time.perf_counter() - start,)))
+    return results
+
+
+def solve_shard(filename, indices, time_limit=None, node_limit=None, latency_targets=None):
+    """
+    Solves the given scenarios of a binary scenario file, reading them
+    straight from the mapping; latency_targets, if given, lists each one's
+    latency target.
+    """
+    latency_targets = latency_targets or [None] * len(indices)
+    with ScenarioFile(filename) as scenarios:
+        chunk = [(index, scenarios[index], target) for index, target in zip(indices, latency_targets)]
+    return solve_chunk(chunk, time_limit, node_limit)
+
+
+NOT_SOLVABLE = ("not solvable", None, None, None, 0.0)
+
+
+def _latency_targets(latency_target):
+    """
+    Returns a function of (index, packed board) giving each puzzle's latency
+    target: latency_target itself if it is such a function, otherwise the
+    same target, a number of seconds or None, for every puzzle.
+    """
+    if callable(latency_target):
+        return latency_target
+    return lambda index, packed: latency_target
+
+
+def _with_skipped(results, skipped):
+    """Yields results, interleaving (index, NOT_SOLVABLE) for indices appended to skipped meanwhile."""
+    for item in results:
+        while skipped:
+            yield skipped.pop(), NOT_SOLVABLE
+        yield item
+    while skipped:
+        yield skipped.pop(), NOT_SOLVABLE
+
+
+def _stream_pool(tasks, max_workers, heuristics, cache_filename=None):
+    """
+    Submits (function, args) tasks to a process pool as they are drawn from
+    tasks, keeping at most two per worker in flight, and yields the items of
+    each task's result list as soon as the task is done. The heuristics are
+    evaluated here first, so the shared tables they build are built once and
+    published to the workers instead of rebuilt by each of them.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    goal = FifteenPuzzleState(GOAL_NUMBERS)
+    for heuristic in heuristics:
+        heuristic(goal)
+    tables = sharedtables.publishTables()
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers, initializer=init_worker,
+                initargs=(heuristics, cache_filename, tables)) as executor:
+            pending = set()
+            while True:
+                task = next(tasks, None)
+                if task is not None:
+                    function, args = task
+                    pending.add(executor.submit(function, *args))
+                if not pending:
+                    break
+                if task is not None and len(pending) < 2 * max_workers:
+                    continue
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+    finally:
+        sharedtables.releaseTables()
+
+
+def solve_batch(puzzles, chunk_size=8, time_limit=PUZZLE_TIME_LIMIT, node_limit=PUZZLE_NODE_LIMIT,
+                max_workers=None, heuristics=SEARCH_HEURISTICS, cache_filename=None, latency_target=None):
+    """
+    Solves a stream of puzzles, given as states or packed boards, in a
+    process pool and yields (index, result) pairs as soon as each chunk is
+    done, index being the puzzle's position in the input. Only packed
+    integers are sent to the workers, chunk_size at a time, and at most two
+    chunks per worker are in flight, so the input is consumed lazily. The
+    heuristics are evaluated once here and each worker runs
+    init_worker(heuristics) once; the default, SEARCH_HEURISTICS, shares the
+    table IDA* uses for deep boards. Add h5 only once its database is
+    built, or the batch waits for the build. Each puzzle gets its own time_limit and
+    node_limit. Unsolvable puzzles are answered in this process and never
+    sent to the pool. With cache_filename, workers share a
+    solutioncache.SolutionCache in that file, so repeated and mirrored
+    boards are only searched once.
+
+    A latency target in seconds trades optimality for speed as in
+    run_search. latency_target is either one target for every puzzle or a
+    function latency_target(index, packed board) returning each puzzle's
+    own, or None to solve it optimally.
+    """
+    skipped = []
+    target_of = _latency_targets(latency_target)
+    encoded = ((index, puzzle.packed if isinstance(puzzle, FifteenPuzzleState) else puzzle)
+               for index, puzzle in enumerate(puzzles))
+
+    def solvable():
+        for index, packed in encoded:
+            if is_solvable(packed):
+                yield index, packed, target_of(index, packed)
+            else:
+                skipped.append(index)
+
+    boards = solvable()
+    chunks = iter(lambda: list(itertools.islice(boards, chunk_size)), [])
+    tasks = ((solve_chunk, (chunk, time_limit, node_limit)) for chunk in chunks)
+    return _with_skipped(_stream_pool(tasks, max_workers, heuristics, cache_filename), skipped)
+
+
+def solve_scenario_file(filename, chunk_size=64, time_limit=PUZZLE_TIME_LIMIT,
+                        node_limit=PUZZLE_NODE_LIMIT, max_workers=None, heuristics=SEARCH_HEURISTICS,
+                        cache_filename=None, latency_target=None):
+    """
+    Like solve_batch for a binary scenario file, except that workers are only
+    sent indices and map their shard of the file themselves. Each block is
+    screened for solvability here first, vectorized when numpy is present.
+    A latency_target function is called here, on each solvable board.
+    """
+    skipped = []
+    target_of = _latency_targets(latency_target)
+
+    def shards():
+        with ScenarioFile(filename) as scenarios:
+            count = len(scenarios)
+            array = scenarios.as_array() if numpy is not None else None
+            for start in range(0, count, chunk_size):
+                stop = min(start + chunk_size, count)
+                if array is not None:
+                    mask = is_solvable_batch(boardsFromPacked(array[start:stop]))
+                else:
+                    mask = [is_solvable(board) for board in scenarios[start:stop]]
+                indices = [index for index, ok in zip(range(start, stop), mask) if ok]
+                skipped.extend(index for index, ok in zip(range(start, stop), mask) if not ok)
+                if indices:
+                    targets = None
+                    if latency_target is not None:
+                        targets = [target_of(index, scenarios[index]) for index in indices]
+                    yield solve_shard, (filename, indices, time_limit, node_limit, targets)
+
+    return _with_skipped(_stream_pool(shards(), max_workers, heuristics, cache_filename), skipped)
+
+
+# Binary scenario files: a header, then one little-endian 64-bit packed
+# board per puzzle. Binary result files: a header, then one fixed-width
+# record per puzzle at the puzzle's index, so results can be written in
+# any order. Both are read through mmap (or numpy.memmap when available).
+SCENARIO_FORMAT_VERSION = 1
+RESULT_FORMAT_VERSION = 2  # 2 added the suboptimality bound
+SCENARIO_MAGIC = b"15PZSCN\0"
+RESULT_MAGIC = b"15PZRES\0"
+FILE_HEADER = struct.Struct("<8sHxxxxxxQ")  # magic, version, record count
+# status, depth (-1 if none), expanded nodes, max fringe size, seconds,
+# suboptimality bound of the path (1 if optimal, 0 if there is none)
+RESULT_RECORD = struct.Struct("<Bxxxiqqdd")
+# STATUS_PENDING marks records not written yet, e.g. after a crash.
+STATUS_SOLVED, STATUS_NOT_SOLVABLE, STATUS_TIMED_OUT, STATUS_NODE_LIMIT, STATUS_PENDING = range(5)
+STATUS_NAMES = {STATUS_NOT_SOLVABLE: "not solvable", STATUS_TIMED_OUT: "timed out",
+                STATUS_NODE_LIMIT: "node limit reached", STATUS_PENDING: "pending"}
+STATUS_CODES = {name: code for code, name in STATUS_NAMES.items()}
+
+
+class _MappedFile:
+    """A read-only mapping of a binary scenario or result file, checked against its header."""
+    magic = None
+    version = None
+    record_size = None
+
+    def __init__(self, filename):
+        with open(filename, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = FILE_HEADER.unpack_from(self.map)
+        if magic != self.magic or version != self.version or \
+                len(self.map) != FILE_HEADER.size + self.count * self.record_size:
+            self.map.close()
+            raise ValueError(f"{filename} is not a version {self.version} {self.__class__.__name__}")
+        self.filename = filename
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ScenarioFile(_MappedFile):
+    """Packed boards of a binary scenario file; index or slice it like a list."""
+    magic = SCENARIO_MAGIC
+    version = SCENARIO_FORMAT_VERSION
+    record_size = 8
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.count)
+            return [self[i] for i in range(start, stop, step)]
+        if not -self.count <= index < self.count:
+            raise IndexError("scenario index out of range")
+        return struct.unpack_from("<Q", self.map, FILE_HEADER.size + 8 * (index % self.count))[0]
+
+    def as_array(self):
+        """The boards as a numpy.memmap of uint64, or a memoryview if numpy is missing."""
+        if numpy is not None:
+            return numpy.memmap(self.filename, dtype="<u8", mode="r",
+                                offset=FILE_HEADER.size, shape=(self.count,))
+        return memoryview(self.map)[FILE_HEADER.size:].cast("Q")
+
+
+class ResultFile(_MappedFile):
+    """Records of a binary result file; result_file[i] is puzzle i's result tuple, and slices work as for lists."""
+    magic = RESULT_MAGIC
+    version = RESULT_FORMAT_VERSION
+    record_size = RESULT_RECORD.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.count)
+            return [self[i] for i in range(start, stop, step)]
+        if not -self.count <= index < self.count:
+            raise IndexError("result index out of range")
+        return _result_from_record(*RESULT_RECORD.unpack_from(
+            self.map, FILE_HEADER.size + RESULT_RECORD.size * (index % self.count)))
+
+    def as_array(self):
+        """The records as a numpy structured memmap; needs numpy."""
+        dtype = numpy.dtype({"names": ["status", "depth", "expanded", "fringe", "time", "suboptimality"],
+                             "formats": ["u1", "<i4", "<i8", "<i8", "<f8", "<f8"],
+                             "offsets": [0, 4, 8, 16, 24, 32], "itemsize": RESULT_RECORD.size})
+        return numpy.memmap(self.filename, dtype=dtype, mode="r",
+                            offset=FILE_HEADER.size, shape=(self.count,))
+
+
+def _result_from_record(status, depth, expanded, fringe, seconds, suboptimality):
+    if status == STATUS_SOLVED:
+        result = f"A* found a path of {depth} moves"
+        if suboptimality != 1:
+            result += f" within {suboptimality:.2g}x optimal"
+    else:
+        result = STATUS_NAMES[status]
+    return (result, None if depth < 0 else depth, None if expanded < 0 else expanded,
+            None if fringe < 0 else fringe, seconds)
+
+
+def write_scenarios(boards, filename="scenarios.bin"):
+    """Writes an iterable of packed boards (or states) as a binary scenario file."""
+    count = 0
+    with open(filename, "wb") as file:
+        file.write(FILE_HEADER.pack(SCENARIO_MAGIC, SCENARIO_FORMAT_VERSION, 0))
+        for board in boards:
+            if isinstance(board, FifteenPuzzleState):
+                board = board.packed
+            file.write(struct.pack("<Q", board))
+            count += 1
+        file.seek(0)
+        file.write(FILE_HEADER.pack(SCENARIO_MAGIC, SCENARIO_FORMAT_VERSION, count))
+    return count
+
+
+def _suboptimality(name):
+    """The factor a run_search result names after "within", or 1 for an optimal path."""
+    found, within, factor = name.partition(" within ")
+    return float(factor.split("x", 1)[0]) if within else 1.0
+
+
+class BinaryResultWriter:
+    """
+    Fills a binary result file with one record per puzzle, written in place
+    at the puzzle's index so results can arrive in any order. Records not
+    yet written read back as pending with no metrics, so after a crash the
+    unsolved puzzles are told apart from real timeouts.
+    """
+
+    def __init__(self, filename, count):
+        self.file = open(filename, "wb")
+        self.file.write(FILE_HEADER.pack(RESULT_MAGIC, RESULT_FORMAT_VERSION, count))
+        empty = RESULT_RECORD.pack(STATUS_PENDING, -1, -1, -1, 0.0, 0.0)
+        for _ in range(count):
+            self.file.write(empty)
+        self.file.flush()
+
+    def write(self, index, result):
+        name, depth, expanded, fringe = result[:4]
+        seconds = result[4] if len(result) > 4 else 0.0
+        record = RESULT_RECORD.pack(
+            STATUS_CODES.get(name, STATUS_SOLVED), -1 if depth is None else depth,
+            -1 if expanded is None else expanded, -1 if fringe is None else fringe, seconds,
+            0.0 if depth is None else _suboptimality(name))
+        os.pwrite(self.file.fileno(), record, FILE_HEADER.size + RESULT_RECORD.size * index)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def csv_to_scenarios(csv_filename="scenarios.csv", binary_filename="scenarios.bin"):
+    """Converts a scenario CSV, in either layout, to a binary scenario file."""
+    return write_scenarios(iter_puzzles_from_csv(csv_filename), binary_filename)
+
+
+def scenarios_to_csv(binary_filename="scenarios.bin", csv_filename="scenarios.csv"):
+    """Converts a binary scenario file to the sixteen-column scenario CSV."""
+    with ScenarioFile(binary_filename) as scenarios:
+        write_puzzles_to_csv((FifteenPuzzleState.fromPacked(scenarios[i]).numbers()
+                              for i in range(len(scenarios))), csv_filename)
+
+
+def results_to_csv(binary_filename="results.bin", csv_filename="results.csv"):
+    """Converts a binary result file to the results CSV written by ResultWriter."""
+    with ResultFile(binary_filename) as results, ResultWriter(csv_filename) as writer:
+        for index in range(len(results)):
+            writer.write(index, results[index])
+
+
+def estimate_difficulty(boards, batch_heuristic=h3Batch):
+    """
+    Scores an array (or binary scenario file) of packed boards with a
+    vectorized heuristic, without building any states. Needs numpy.
+    """
+    if isinstance(boards, ScenarioFile):
+        boards = boards.as_array()
+    return batch_heuristic(boardsFromPacked(boards))
+
+
+def sort_by_difficulty(boards, batch_heuristic=h3Batch):
+    """Returns the indices of packed boards ordered from easiest to hardest estimate."""
+    return numpy.argsort(estimate_difficulty(boards, batch_heuristic), kind="stable")
+
+
 def write_puzzles_to_csv(puzzles, filename="scenarios.csv"):
     with open(filename, mode="w", newline="") as file:
         writer = csv.writer(file)
@@ -86,13 +651,8 @@ if __name__ == "__main__":
     config = generate_random_puzzles()
     write_puzzles_to_csv(config)
 
-    # Read puzzles from CSV
-    puzzles = read_puzzles_from_csv()
-
-    # Solve each puzzle in parallel
-    with concurrent.futures.ProcessPoolExecutor() as executor:
-        results = list(executor.map(solve_puzzle, puzzles))
-
-    # Write results to CSV
-    write_results_to_csv(results)
+    # Stream puzzles from the CSV through the pool, writing each result as it arrives
+    with ResultWriter("results.csv") as writer:
+        for index, result in solve_batch(iter_puzzles_from_csv(), cache_filename="solutions.db"):
+            writer.write(index, result)
     print("Results have been written to results.csv")
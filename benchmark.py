@@ -0,0 +1,335 @@
+"""
+Reproducible benchmarks of the search algorithms, heuristics and fringe
+implementations on fixed instance sets.
+
+Instances come from seeded tiers of random walks away from the goal and,
+optionally, from instance files such as Korf's 100 random 15-puzzle
+instances. Every algorithm x heuristic x queue combination is run in a
+fresh process under the same BudgetedSearchProblem limits, so its peak RSS is its own, and the results are written as
+JSON to be compared against a run from another commit:
+
+    python benchmark.py --tiers shallow,medium --output before.json
+    python benchmark.py --tiers shallow,medium --output after.json --compare before.json
+"""
+
+import search
+import util
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from fifteenpuzzle import (
+    createRandomFifteenPuzzle,
+    FifteenPuzzleState,
+    FifteenPuzzleSearchProblem,
+    is_solvable,
+    h1,
+    h2,
+    h3,
+    incrementalH4,
+    h6,
+    h7,
+    manhattanHeuristicTo,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+FORMAT_VERSION = 1
+
+# name -> (random-walk length, number of instances, seed)
+TIERS = {
+    "shallow": (20, 20, 1),
+    "medium": (40, 20, 2),
+    "deep": (80, 10, 3),
+}
+
+
+def bidirectional_mm_search(problem, heuristic, stats=None):
+    """
+    MM guided by heuristic toward the goal and, as no other heuristic here
+    takes a target, by Manhattan distance back toward the start.
+    """
+    return search.bidirectionalMMSearch(problem, heuristic, manhattanHeuristicTo(problem.getStartState()),
+                                        stats=stats)
+
+
+ALGORITHMS = {
+    "astar": search.aStarSearch,
+    "idastar": search.idaStarSearch,
+    "bfs": search.breadthFirstSearch,
+    "ucs": search.uniformCostSearch,
+    "bidirectional": search.bidirectionalSearch,
+    "mm": bidirectional_mm_search,
+}
+UNINFORMED_ALGORITHMS = {"bfs", "ucs", "bidirectional"}  # run once, under heuristic "none"
+
+# h4 itself returns (out of row, out of column); its summed form is used.
+HEURISTICS = {
+    "h1": h1,
+    "h2": h2,
+    "h3": h3,
+    "h4": incrementalH4,
+    "h6": h6,
+    "h7": h7,
+}
+
+# Fringe implementations for aStarSearch's priorityQueue argument; "auto"
+# leaves the choice to aStarSearch. The other algorithms build their own
+# fringe and run once, reported under its name in FIXED_QUEUES: "fifo" is
+# the deque-backed util.Queue, "heap" util.PriorityQueue, and "none" means
+# no queue at all (IDA*'s recursion, bidirectional search's layer lists).
+QUEUES = {
+    "auto": None,
+    "bucket": util.BucketPriorityQueue,
+    "heap": util.PriorityQueue,
+    "indexed": lambda: util.PriorityQueue(indexed=True),
+}
+QUEUED_ALGORITHMS = {"astar"}
+FIXED_QUEUES = {
+    "idastar": "none",
+    "bfs": "fifo",
+    "ucs": "heap",
+    "bidirectional": "none",
+    "mm": "heap",
+}
+
+TIME_LIMIT = 30.0  # seconds per instance
+NODE_LIMIT = 2000000  # expansions per instance
+
+
+def tier_instances(name):
+    """Returns the boards of a seeded tier; the same name always gives the same boards."""
+    moves, count, seed = TIERS[name]
+    return [createRandomFifteenPuzzle(moves, seed=seed * 1000003 + i).numbers()
+            for i in range(count)]
+
+
+def from_blank_first_goal(tiles):
+    """
+    Converts a board whose goal is 0, 1, ..., 15 (blank first, as in Korf's
+    instances) to the equivalent board for this repository's goal of
+    1, ..., 15, 0: the board is rotated half a turn and tile t becomes
+    16 - t. Both goals are fixed by the same rotation and relabelling, so
+    the optimal solution length is unchanged.
+    """
+    return [0 if tile == 0 else 16 - tile for tile in reversed(tiles)]
+
+
+def load_instances(filename, blank_first=False):
+    """
+    Reads one board per line from a text file: sixteen tiles, optionally
+    preceded by an instance number, separated by spaces or commas. Blank
+    lines and lines starting with # are skipped.
+    """
+    instances = []
+    with open(filename) as file:
+        for line_number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            tiles = [int(cell) for cell in line.replace(",", " ").split()]
+            if len(tiles) == 17:
+                tiles = tiles[1:]
+            if sorted(tiles) != list(range(16)):
+                raise ValueError(f"{filename}:{line_number}: not a 15-puzzle board")
+            instances.append(from_blank_first_goal(tiles) if blank_first else tiles)
+    return instances
+
+
+def peak_rss_kb():
+    """The peak resident set size of this process in KiB, or None where it cannot be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak //= 1024  # reported in bytes
+    return peak
+
+
+def run_instance(algorithm, heuristic, queue, tiles, time_limit, node_limit):
+    """
+    Solves one board and returns its measurements. heuristic is None for
+    uninformed algorithms, and queue None where the algorithm chooses its
+    own fringe.
+    """
+    problem = search.BudgetedSearchProblem(
+        FifteenPuzzleSearchProblem(FifteenPuzzleState(tiles)), time_limit, node_limit)
+    stats = search.SearchStats()
+    args = (problem,) if heuristic is None else (problem, heuristic)
+    kwargs = {"stats": stats}
+    if queue is not None:
+        kwargs["priorityQueue"] = queue
+    status = "solved"
+    depth = None
+    start = time.perf_counter()
+    try:
+        result = algorithm(*args, **kwargs)
+        path = result[0] if isinstance(result, tuple) else result  # A*-style (path, expanded, max fringe)
+        depth = len(path)
+    except util.NodeLimitException:
+        status = "node limit reached"
+    except util.TimeoutFunctionException:
+        status = "timed out"
+    wall_time = time.perf_counter() - start
+    return {
+        "status": status,
+        "depth": depth,
+        "expanded": stats.expanded,
+        "generated": stats.generated,
+        "max_fringe_size": stats.maxFringeSize,
+        "heuristic_time": stats.heuristicTime,
+        "successor_time": stats.successorTime,
+        "wall_time": wall_time,
+    }
+
+
+def run_combination(algorithm_name, heuristic_name, queue_name, instances, time_limit, node_limit):
+    """
+    Runs one combination over every instance. Meant to be the only task of
+    a fresh worker process, so the peak RSS it reports is its own.
+    """
+    algorithm = ALGORITHMS[algorithm_name]
+    heuristic = HEURISTICS.get(heuristic_name)
+    queue = QUEUES[queue_name] if algorithm_name in QUEUED_ALGORITHMS else None
+    runs = [run_instance(algorithm, heuristic, queue, tiles, time_limit, node_limit)
+            for tiles in instances]
+    expanded = sum(run["expanded"] for run in runs)
+    wall_time = sum(run["wall_time"] for run in runs)
+    return {
+        "algorithm": algorithm_name,
+        "heuristic": heuristic_name,
+        "queue": queue_name,
+        "instances": len(runs),
+        "solved": sum(run["status"] == "solved" for run in runs),
+        "expanded": expanded,
+        "generated": sum(run["generated"] for run in runs),
+        "wall_time": wall_time,
+        "nodes_per_second": expanded / wall_time if wall_time else 0.0,
+        "peak_rss_kb": peak_rss_kb(),
+        "runs": runs,
+    }
+
+
+def combinations(algorithms, heuristics, queues):
+    for algorithm in algorithms:
+        for heuristic in ("none",) if algorithm in UNINFORMED_ALGORITHMS else heuristics:
+            if algorithm in QUEUED_ALGORITHMS:
+                for queue in queues:
+                    yield algorithm, heuristic, queue
+            else:
+                yield algorithm, heuristic, FIXED_QUEUES[algorithm]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)),
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(instance_sets, algorithms=tuple(ALGORITHMS), heuristics=("h1", "h2", "h3", "h4"),
+                   queues=tuple(QUEUES), time_limit=TIME_LIMIT, node_limit=NODE_LIMIT):
+    """
+    Runs every combination on every instance set ({name: [boards]}) and
+    returns the report as a JSON-serializable dict. Unsolvable boards are
+    dropped before timing. A combination that raises is recorded with its
+    error instead of stopping the run.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for set_name, instances in instance_sets.items():
+        instances = [tiles for tiles in instances if is_solvable(FifteenPuzzleState(tiles))]
+        for algorithm, heuristic, queue in combinations(algorithms, heuristics, queues):
+            try:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    result = executor.submit(run_combination, algorithm, heuristic, queue,
+                                             instances, time_limit, node_limit).result()
+            except Exception as error:
+                results.append({"instance_set": set_name, "algorithm": algorithm, "heuristic": heuristic,
+                                "queue": queue, "error": f"{error.__class__.__name__}: {error}"})
+                print(f"{set_name:>10} {algorithm:>13} {heuristic:>4} {queue:>8}: "
+                      f"failed with {results[-1]['error']}")
+                continue
+            result["instance_set"] = set_name
+            results.append(result)
+            print(f"{set_name:>10} {algorithm:>13} {heuristic:>4} {queue:>8}: "
+                  f"{result['solved']}/{result['instances']} solved, {result['expanded']} expanded, "
+                  f"{result['wall_time']:.2f}s, {result['nodes_per_second']:.0f} nodes/s, "
+                  f"peak RSS {result['peak_rss_kb']} KiB")
+    return {
+        "format_version": FORMAT_VERSION,
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "time_limit": time_limit,
+        "node_limit": node_limit,
+        "instance_sets": dict(instance_sets),
+        "results": results,
+    }
+
+
+def compare_reports(baseline, current):
+    """
+    Prints, for each combination present in both reports, the ratio of the
+    current wall time and expanded nodes to the baseline's. Ratios above 1
+    are regressions. Combinations that failed in either report are listed as
+    such.
+    """
+    def key(result):
+        return result["instance_set"], result["algorithm"], result["heuristic"], result["queue"]
+
+    before = {key(result): result for result in baseline["results"]}
+    for result in current["results"]:
+        old = before.get(key(result))
+        if old is None:
+            continue
+        if "error" in result or "error" in old:
+            print("%10s %13s %4s %8s: failed" % key(result))
+            continue
+        time_ratio = result["wall_time"] / old["wall_time"] if old["wall_time"] else float("inf")
+        node_ratio = result["expanded"] / old["expanded"] if old["expanded"] else float("inf")
+        print("%10s %13s %4s %8s: time x%.2f, expanded x%.2f" % (key(result) + (time_ratio, node_ratio)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tiers", default="shallow,medium",
+                        help="comma-separated seeded tiers: " + ", ".join(TIERS))
+    parser.add_argument("--instances", action="append", default=[],
+                        help="a file of boards, e.g. Korf's 100 instances; may be repeated")
+    parser.add_argument("--blank-first", action="store_true",
+                        help="the instance files use the goal 0, 1, ..., 15")
+    parser.add_argument("--algorithms", default=",".join(ALGORITHMS))
+    parser.add_argument("--heuristics", default="h1,h2,h3,h4")
+    parser.add_argument("--queues", default=",".join(QUEUES))
+    parser.add_argument("--time-limit", type=float, default=TIME_LIMIT)
+    parser.add_argument("--node-limit", type=int, default=NODE_LIMIT)
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", help="a previous report to compare against")
+    args = parser.parse_args()
+
+    instance_sets = {name: tier_instances(name) for name in args.tiers.split(",") if name}
+    for filename in args.instances:
+        instance_sets[os.path.basename(filename)] = load_instances(filename, args.blank_first)
+
+    report = run_benchmarks(instance_sets, args.algorithms.split(","), args.heuristics.split(","),
+                            args.queues.split(","), args.time_limit, args.node_limit)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results have been written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare_reports(json.load(file), report)
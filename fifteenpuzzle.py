@@ -1,79 +1,215 @@
 import search
+import patterndb
+import sharedtables
 import random
 import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
  
 # Module Classes
+GOAL_NUMBERS = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0]
+GOAL_PACKED = sum(value << (4 * index) for index, value in enumerate(GOAL_NUMBERS))
+MOVE_OFFSETS = {'up': -4, 'down': 4, 'left': -1, 'right': 1}
+
+# Inside the search problem moves are small integers, the direction the blank
+# travels; names are only used at the edges (legalMoves, printing a path).
+# A move's reverse is its code with the lowest bit flipped.
+UP, DOWN, LEFT, RIGHT = range(4)
+MOVE_NAMES = ('up', 'down', 'left', 'right')
+MOVE_CODES = {name: code for code, name in enumerate(MOVE_NAMES)}
+REVERSE_MOVE_CODES = (DOWN, UP, RIGHT, LEFT)
+
+def _buildMoveTables():
+    """
+    Precomputes, for every blank cell, the legal moves and where each one
+    takes the blank, so that generating successors needs no bounds checks
+    and no string comparisons.
+    """
+    targets = []  # blank -> {move code or name: target cell}
+    legalCodes = []  # blank -> legal move codes
+    legalNames = []  # blank -> legal move names
+    successorMoves = []  # blank -> ((code, target, 4 * target, packed delta per unit of tile), ...)
+    for blank in range(16):
+        row, col = divmod(blank, 4)
+        legal = [code for code, allowed in enumerate((row > 0, row < 3, col > 0, col < 3)) if allowed]
+        moveTargets = {}
+        moves = []
+        for code in legal:
+            target = blank + MOVE_OFFSETS[MOVE_NAMES[code]]
+            moveTargets[code] = moveTargets[MOVE_NAMES[code]] = target
+            moves.append((code, target, 4 * target, (1 << (4 * blank)) - (1 << (4 * target))))
+        targets.append(moveTargets)
+        legalCodes.append(tuple(legal))
+        legalNames.append(tuple(MOVE_NAMES[code] for code in legal))
+        successorMoves.append(tuple(moves))
+    return tuple(targets), tuple(legalCodes), tuple(legalNames), tuple(successorMoves)
+
+MOVE_TARGETS, LEGAL_MOVES, LEGAL_MOVE_NAMES, SUCCESSOR_MOVES = _buildMoveTables()
+
+# The goal is its own mirror image in the main diagonal once tiles are
+# relabelled: the tile whose home is (row, col) becomes the one whose home is
+# (col, row). Reflecting a board that way, and swapping up with left and down
+# with right, turns any solution into one for the reflected board.
+TRANSPOSED_CELLS = tuple(4 * (cell % 4) + cell // 4 for cell in range(16))
+TRANSPOSED_TILES = (0,) + tuple(TRANSPOSED_CELLS[tile - 1] + 1 for tile in range(1, 16))
+REFLECTED_MOVE_CODES = (LEFT, RIGHT, UP, DOWN)
+
+def reflectPacked(packed):
+    """Returns the packed board mirrored in the main diagonal, tiles relabelled to match."""
+    reflected = 0
+    for cell in range(16):
+        tile = (packed >> (4 * cell)) & 0xF
+        reflected |= TRANSPOSED_TILES[tile] << (4 * TRANSPOSED_CELLS[cell])
+    return reflected
+
+def moveNames(actions):
+    """Returns the names of a sequence of moves given as codes or names, e.g. to print a path."""
+    return [action if action.__class__ is str else MOVE_NAMES[action] for action in actions]
+
+# Zobrist keys: a fixed-seed random 64-bit number per (tile, cell), the blank's
+# all zero. A board hashes to the XOR of its tiles' keys, so the hash is the
+# same in every process and run, unlike hash() of a str, and a move updates
+# it with two XORs: the slid tile's key leaves its cell and joins the blank's.
+_zobristRandom = random.Random(0x15)
+ZOBRIST_TABLE = tuple(tuple(0 if tile == 0 else _zobristRandom.getrandbits(64) for cell in range(16))
+                      for tile in range(16))
+del _zobristRandom
+
+def zobristHash(packed):
+    """Returns the 64-bit Zobrist hash of a packed board."""
+    value = 0
+    for cell in range(16):
+        value ^= ZOBRIST_TABLE[(packed >> (4 * cell)) & 0xF][cell]
+    return value
+
+def packNumbers(numbers):
+    """Packs a flat row-major list of 16 tiles into the 64-bit encoding used by FifteenPuzzleState."""
+    packed = 0
+    for index, value in enumerate(numbers):
+        packed |= value << (4 * index)
+    return packed
+
 class FifteenPuzzleState:
-    """The Fifteen Puzzle is an extension of the Eight Puzzle to a 4x4 grid."""
+    """
+    The Fifteen Puzzle is an extension of the Eight Puzzle to a 4x4 grid.
+
+    The board is packed into one 64-bit integer, four bits per tile, with the
+    tile in cell i (row-major) stored in bits 4*i .. 4*i+3. The index of the
+    blank is cached so that a move is a single nibble swap, and so is the
+    board's Zobrist hash, which moves keep up to date incrementally; it is
+    the state's hash() and FifteenPuzzleSearchProblem.getStateHash, stable
+    across processes for sharding states or indexing external tables.
+    `cells` is a lazy list-of-lists view kept for callers that index the
+    grid directly.
+    """
+    __slots__ = ('packed', 'blank', 'zobrist', '_cells')
  
     def __init__(self, numbers):
-        self.cells = []
-        numbers = numbers[:]  # Make a copy to avoid side-effects.
-        numbers.reverse()
-        for row in range(4):
-            self.cells.append([])
-            for col in range(4):
-                self.cells[row].append(numbers.pop())
-                if self.cells[row][col] == 0:
-                    self.blankLocation = row, col
+        packed = 0
+        blank = 0
+        for index, value in enumerate(numbers):
+            packed |= value << (4 * index)
+            if value == 0:
+                blank = index
+        self.packed = packed
+        self.blank = blank
+        self.zobrist = zobristHash(packed)
+        self._cells = None
+
+    @classmethod
+    def fromPacked(cls, packed, blank=None, zobrist=None):
+        """Builds a state directly from its packed encoding."""
+        state = cls.__new__(cls)
+        if blank is None:
+            blank = 0
+            while (packed >> (4 * blank)) & 0xF:
+                blank += 1
+        state.packed = packed
+        state.blank = blank
+        state.zobrist = zobristHash(packed) if zobrist is None else zobrist
+        state._cells = None
+        return state
+
+    @property
+    def blankLocation(self):
+        return divmod(self.blank, 4)
+
+    @property
+    def cells(self):
+        """The board as four rows of four tiles, built on first access."""
+        if self._cells is None:
+            packed = self.packed
+            self._cells = [[(packed >> (4 * (row * 4 + col))) & 0xF for col in range(4)]
+                           for row in range(4)]
+        return self._cells
+
+    def numbers(self):
+        """Returns the tiles as a flat row-major list."""
+        packed = self.packed
+        return [(packed >> (4 * index)) & 0xF for index in range(16)]
         
     def isGoal(self):
         """Checks if the puzzle is in its goal state."""
-        current = 1
-        for row in range(4):
-            for col in range(4):
-                if row == 3 and col == 3:
-                    if self.cells[row][col] != 0:
-                        return False
-                else:
-                    if self.cells[row][col] != current:
-                        return False
-                    current += 1
-        return True
+        return self.packed == GOAL_PACKED
  
     def legalMoves(self):
         """Returns a list of legal moves from the current state."""
-        moves = []
-        row, col = self.blankLocation
-        if row > 0:
-            moves.append('up')
-        if row < 3:
-            moves.append('down')
-        if col > 0:
-            moves.append('left')
-        if col < 3:
-            moves.append('right')
-        return moves
+        return list(LEGAL_MOVE_NAMES[self.blank])
  
     def result(self, move):
-        """Returns a new FifteenPuzzle with the updated state based on the provided move."""
-        row, col = self.blankLocation
-        if move == 'up':
-            newrow, newcol = row - 1, col
-        elif move == 'down':
-            newrow, newcol = row + 1, col
-        elif move == 'left':
-            newrow, newcol = row, col - 1
-        elif move == 'right':
-            newrow, newcol = row, col + 1
-        else:
+        """
+        Returns a new FifteenPuzzle with the updated state based on the
+        provided move, given as a name or a move code.
+        """
+        blank = self.blank
+        try:
+            target = MOVE_TARGETS[blank][move]
+        except KeyError:
             raise ValueError("Illegal Move")
  
-        newPuzzle = FifteenPuzzleState([0]*16)
-        newPuzzle.cells = [values[:] for values in self.cells]
-        newPuzzle.cells[row][col], newPuzzle.cells[newrow][newcol] = self.cells[newrow][newcol], self.cells[row][col]
-        newPuzzle.blankLocation = newrow, newcol
+        # The blank is stored as 0, so sliding a tile only needs its value
+        # added at the blank's nibble and subtracted from its own.
+        tile = (self.packed >> (4 * target)) & 0xF
+        keys = ZOBRIST_TABLE[tile]
+        newPuzzle = FifteenPuzzleState.__new__(FifteenPuzzleState)
+        newPuzzle.packed = self.packed + (tile << (4 * blank)) - (tile << (4 * target))
+        newPuzzle.blank = target
+        newPuzzle.zobrist = self.zobrist ^ keys[target] ^ keys[blank]
+        newPuzzle._cells = None
         return newPuzzle
+
+    def applyMove(self, move):
+        """
+        Slides a tile in place instead of building a new state. Searches that
+        backtrack undo it with the reverse move; a state must not be mutated
+        while it is stored in a set or dict.
+        """
+        blank = self.blank
+        try:
+            target = MOVE_TARGETS[blank][move]
+        except KeyError:
+            raise ValueError("Illegal Move")
+        tile = (self.packed >> (4 * target)) & 0xF
+        keys = ZOBRIST_TABLE[tile]
+        self.packed += (tile << (4 * blank)) - (tile << (4 * target))
+        self.blank = target
+        self.zobrist ^= keys[target] ^ keys[blank]
+        self._cells = None
  
     def __eq__(self, other):
         """Overloads '==' for comparing puzzle configurations."""
-        for row in range(4):
-            if self.cells[row] != other.cells[row]:
-                return False
-        return True
+        if not isinstance(other, FifteenPuzzleState):
+            return NotImplemented
+        return self.packed == other.packed
  
     def __hash__(self):
-        return hash(str(self.cells))
+        return self.zobrist
+
+    def __reduce__(self):
+        return (FifteenPuzzleState.fromPacked, (self.packed, self.blank, self.zobrist))
  
     def __getAsciiString(self):
         """Returns a display string for the puzzle."""
@@ -97,7 +233,12 @@ class FifteenPuzzleState:
  
 # The Search Problem Class
 class FifteenPuzzleSearchProblem(search.SearchProblem):
-    """Implementation of a SearchProblem for the Fifteen Puzzle domain."""
+    """
+    Implementation of a SearchProblem for the Fifteen Puzzle domain.
+
+    Actions are the move codes UP, DOWN, LEFT and RIGHT; moveNames turns a
+    solution path into names.
+    """
  
     def __init__(self, puzzle):
         self.puzzle = puzzle
@@ -109,14 +250,67 @@ class FifteenPuzzleSearchProblem(search.SearchProblem):
         return state.isGoal()
  
     def getSuccessors(self, state):
-        successors = []
-        for action in state.legalMoves():
-            successor = state.result(action)
-            successors.append((successor, action, 1))
-        return successors
+        return list(self.iterSuccessors(state))
+
+    def iterSuccessors(self, state):
+        """
+        Yields the (successor, action, stepCost) triples of getSuccessors one
+        at a time, without building a list.
+        """
+        packed = state.packed
+        blank = state.blank
+        zobrist = state.zobrist
+        new = FifteenPuzzleState.__new__
+        for action, target, shift, delta in SUCCESSOR_MOVES[blank]:
+            tile = (packed >> shift) & 0xF
+            keys = ZOBRIST_TABLE[tile]
+            successor = new(FifteenPuzzleState)
+            successor.packed = packed + tile * delta
+            successor.blank = target
+            successor.zobrist = zobrist ^ keys[target] ^ keys[blank]
+            successor._cells = None
+            yield successor, action, 1
  
     def getCostOfActions(self, actions):
         return len(actions)
+
+    def getStateKey(self, state):
+        return state.packed
+
+    def getStateHash(self, state):
+        return state.zobrist
+
+    def getStateFromKey(self, key):
+        return FifteenPuzzleState.fromPacked(key)
+
+    def getSuccessorKeys(self, key):
+        """The packed boards of a packed board's successors, for search.layeredBreadthFirstSearch."""
+        blank = 0
+        while (key >> (4 * blank)) & 0xF:
+            blank += 1
+        return [key + ((key >> shift) & 0xF) * delta for action, target, shift, delta in SUCCESSOR_MOVES[blank]]
+
+    def getGoalState(self):
+        return FifteenPuzzleState(GOAL_NUMBERS)
+
+    def getReverseSuccessors(self, state):
+        # Every move is undone by its reverse, so the predecessors are the
+        # successors, reached by the reverse of the move that led to them.
+        return [(successor, REVERSE_MOVE_CODES[action], 1)
+                for successor, action, stepCost in self.iterSuccessors(state)]
+
+    def getActions(self, state):
+        return LEGAL_MOVES[state.blank]
+
+    def applyAction(self, state, action):
+        state.applyMove(action)
+        return 1
+
+    def undoAction(self, state, action):
+        state.applyMove(REVERSE_MOVE_CODES[action])
+
+    def reverseAction(self, action):
+        return REVERSE_MOVE_CODES[action]
  
     def getHeuristic(self, state):
         return h2(state)  # Change heuristic here as needed
@@ -155,17 +349,67 @@ def loadFifteenPuzzle(puzzleNumber):
         raise ValueError("Invalid puzzle number")
     return FifteenPuzzleState(FIFTEEN_PUZZLE_DATA[puzzleNumber])
  
-def createRandomFifteenPuzzle(moves=100):
-    """Creates a random fifteen puzzle by applying a series of random moves."""
+def is_solvable(puzzle):
+    """
+    Returns whether a puzzle, given as a state or a packed board, can reach
+    the goal. With an even board width that holds exactly when the parity of
+    the tile permutation (blank left out, in reading order) differs from the
+    parity of the blank's row. The permutation parity comes from counting its
+    cycles, which is linear in the number of tiles.
+    """
+    packed = puzzle.packed if isinstance(puzzle, FifteenPuzzleState) else puzzle
+    tiles = []
+    blankRow = 0
+    for cell in range(16):
+        tile = (packed >> (4 * cell)) & 0xF
+        if tile:
+            tiles.append(tile - 1)
+        else:
+            blankRow = cell // 4
+    cycles = 0
+    seen = 0
+    for start in range(15):
+        if not seen & (1 << start):
+            cycles += 1
+            position = start
+            while not seen & (1 << position):
+                seen |= 1 << position
+                position = tiles[position]
+    return (15 - cycles + blankRow) % 2 == 1
+
+def is_solvable_batch(boards):
+    """
+    is_solvable over an (N, 16) array of boards, returning an (N,) bool
+    array. Inversions are counted by comparing every pair of cells at once,
+    so memory grows as N * 256 bytes; split very large sets. Needs numpy.
+    """
+    boards = numpy.asarray(boards)
+    tiles = boards.astype(numpy.int16)
+    later = numpy.triu(numpy.ones((16, 16), dtype=bool), 1)
+    inverted = (tiles[:, :, None] > tiles[:, None, :]) & (tiles[:, None, :] != 0) & later
+    inversions = inverted.sum(axis=(1, 2))
+    blankRows = numpy.argmax(boards == 0, axis=1) // 4
+    return (inversions + blankRows) % 2 == 1
+
+def createRandomFifteenPuzzle(moves=100, seed=None):
+    """
+    Creates a random fifteen puzzle by applying a series of random moves.
+    Given a seed, the moves come from a private random.Random(seed), so the
+    same seed always yields the same puzzle without disturbing the global
+    random state.
+    """
+    rng = random if seed is None else random.Random(seed)
     puzzle = FifteenPuzzleState([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0])
     for _ in range(moves):
-        move = random.choice(puzzle.legalMoves())
+        move = rng.choice(puzzle.legalMoves())
         puzzle = puzzle.result(move)
     return puzzle
  
+GOAL_POSITIONS = {value: divmod(index, 4) for index, value in enumerate(GOAL_NUMBERS)}
+
 def h1(state, problem=None):
     """Returns the number of misplaced tiles for the 15-puzzle."""
-    goal = list(range(1, 16)) + [0]
+    goal = GOAL_NUMBERS
     misplaced_tiles = 0
     current = 0
     for row in range(4):
@@ -178,24 +422,7 @@ def h1(state, problem=None):
  
 def h2(state, problem=None):
     """Returns the sum of the Euclidean distances of each tile from its actual goal position."""
-    goal_positions = {
-        0: (3, 3),
-        1: (0, 0),
-        2: (0, 1),
-        3: (0, 2),
-        4: (0, 3),
-        5: (1, 0),
-        6: (1, 1),
-        7: (1, 2),
-        8: (1, 3),
-        9: (2, 0),
-        10: (2, 1),
-        11: (2, 2),
-        12: (2, 3),
-        13: (3, 0),
-        14: (3, 1),
-        15: (3, 2)
-    }
+    goal_positions = GOAL_POSITIONS
    
     total_distance = 0
     for row in range(4):
@@ -208,24 +435,7 @@ def h2(state, problem=None):
  
 def h3(state, problem=None):
     """Returns the sum of the Manhattan distances of each tile from its goal position."""
-    goal_positions = {
-        0: (3, 3),
-        1: (0, 0),
-        2: (0, 1),
-        3: (0, 2),
-        4: (0, 3),
-        5: (1, 0),
-        6: (1, 1),
-        7: (1, 2),
-        8: (1, 3),
-        9: (2, 0),
-        10: (2, 1),
-        11: (2, 2),
-        12: (2, 3),
-        13: (3, 0),
-        14: (3, 1),
-        15: (3, 2)
-    }
+    goal_positions = GOAL_POSITIONS
    
     total_distance = 0
     for row in range(4):
@@ -251,14 +461,260 @@ def h4(state, problem=None):
                 if goal_col != col:
                     out_of_column += 1
     return out_of_row, out_of_column
+
+class IncrementalHeuristic:
+    """
+    A heuristic that is a sum of independent per-tile costs, tileCost(tile,
+    row, col, goalRow, goalCol). A slide moves exactly one tile, so the value
+    of a successor is its parent's plus one entry of a precomputed
+    (tile, from cell, to cell) delta table. aStarSearch recognizes the
+    successorValue method and only evaluates the start state in full.
+
+    The target defaults to the goal; any other flat board can be given, e.g.
+    to guide a backward search toward the start state.
+    """
+
+    def __init__(self, tileCost, target=GOAL_NUMBERS):
+        positions = {value: divmod(index, 4) for index, value in enumerate(target)}
+        self.costs = [[0] * 16 for _ in range(16)]
+        for tile in range(1, 16):
+            goal_row, goal_col = positions[tile]
+            for cell in range(16):
+                row, col = divmod(cell, 4)
+                self.costs[tile][cell] = tileCost(tile, row, col, goal_row, goal_col)
+        self.deltas = [0] * (16 * 16 * 16)
+        for tile in range(16):
+            for source in range(16):
+                for destination in range(16):
+                    self.deltas[(tile << 8) | (source << 4) | destination] = \
+                        self.costs[tile][destination] - self.costs[tile][source]
+
+    def __call__(self, state, problem=None):
+        packed = state.packed
+        costs = self.costs
+        return sum(costs[(packed >> (4 * cell)) & 0xF][cell] for cell in range(16))
+
+    def successorValue(self, value, state, action, successor):
+        """The tile that slid now sits where the parent's blank was."""
+        tile = (successor.packed >> (4 * state.blank)) & 0xF
+        return value + self.deltas[(tile << 8) | (successor.blank << 4) | state.blank]
+
+incrementalH1 = IncrementalHeuristic(
+    lambda tile, row, col, goal_row, goal_col: int((row, col) != (goal_row, goal_col)))
+incrementalH2 = IncrementalHeuristic(
+    lambda tile, row, col, goal_row, goal_col: math.sqrt((goal_row - row) ** 2 + (goal_col - col) ** 2))
+incrementalH3 = IncrementalHeuristic(
+    lambda tile, row, col, goal_row, goal_col: abs(goal_row - row) + abs(goal_col - col))
+incrementalH4 = IncrementalHeuristic(
+    lambda tile, row, col, goal_row, goal_col: int(row != goal_row) + int(col != goal_col))
+
+class BatchHeuristic:
+    """
+    NumPy evaluation of a per-tile cost heuristic over many boards at once.
+    Boards are an (N, 16) integer array of row-major tiles and a score is a
+    gather of table[tile, cell] summed along each row. Instances are also
+    plain heuristics, and aStarSearch uses evaluateMany to score all the
+    successors of a node in one call. Needs numpy.
+    """
+
+    def __init__(self, incremental):
+        if numpy is None:
+            raise ImportError("BatchHeuristic needs numpy")
+        self.table = numpy.array(incremental.costs)
+        self.cells = numpy.arange(16)
+
+    def evaluateBoards(self, boards):
+        """Returns the (N,) heuristic values of an (N, 16) array of boards."""
+        return self.table[boards, self.cells].sum(axis=1)
+
+    def evaluateMany(self, states, problem=None):
+        packed = numpy.fromiter((state.packed for state in states), dtype=numpy.uint64, count=len(states))
+        return self.evaluateBoards(boardsFromPacked(packed)).tolist()
+
+    def __call__(self, state, problem=None):
+        return self.evaluateMany([state], problem)[0]
+
+def boardsFromPacked(packed):
+    """Unpacks an (N,) array of packed boards into an (N, 16) uint8 array of tiles."""
+    shifts = numpy.arange(0, 64, 4, dtype=numpy.uint64)
+    return ((numpy.asarray(packed, dtype=numpy.uint64)[:, None] >> shifts) & numpy.uint64(0xF)).astype(numpy.uint8)
+
+if numpy is not None:
+    batchH1 = BatchHeuristic(incrementalH1)
+    batchH2 = BatchHeuristic(incrementalH2)
+    batchH3 = BatchHeuristic(incrementalH3)
+    batchH4 = BatchHeuristic(incrementalH4)
+
+def h1Batch(boards):
+    """h1 over an (N, 16) array of boards."""
+    return batchH1.evaluateBoards(boards)
+
+def h2Batch(boards):
+    """h2 over an (N, 16) array of boards."""
+    return batchH2.evaluateBoards(boards)
+
+def h3Batch(boards):
+    """h3 over an (N, 16) array of boards."""
+    return batchH3.evaluateBoards(boards)
+
+def h4Batch(boards):
+    """h4 over an (N, 16) array of boards, with the row and column counts summed."""
+    return batchH4.evaluateBoards(boards)
+
+def manhattanHeuristicTo(target):
+    """Returns a Manhattan distance heuristic toward the target state, e.g. for the backward half of search.bidirectionalMMSearch."""
+    return IncrementalHeuristic(
+        lambda tile, row, col, goal_row, goal_col: abs(goal_row - row) + abs(goal_col - col),
+        target.numbers())
+
+def _lineConflicts(goalIndices):
+    """
+    Linear-conflict penalty for one row or column, given the goal position
+    along that line of each tile that belongs to it, in current order. Tiles
+    that must leave the line to let the others pass cost two moves each, and
+    the fewest such tiles is the line length minus its longest increasing run.
+    """
+    longest = [1] * len(goalIndices)
+    for i in range(len(goalIndices)):
+        for j in range(i):
+            if goalIndices[j] < goalIndices[i] and longest[j] + 1 > longest[i]:
+                longest[i] = longest[j] + 1
+    return 2 * (len(goalIndices) - max(longest, default=0))
+
+def _buildLineConflictTables():
+    """
+    Returns the conflict penalties of every row, then every column, as one
+    flat table: entry (line << 16) | key for rows 0-3, ((4 + line) << 16) | key
+    for columns, key being the line's four tiles packed as nibbles (first
+    cell lowest).
+    """
+    table = bytearray(8 << 16)
+    for line in range(4):
+        rowOffset = line << 16
+        columnOffset = (4 + line) << 16
+        for key in range(1 << 16):
+            tiles = [(key >> (4 * i)) & 0xF for i in range(4)]
+            table[rowOffset | key] = _lineConflicts(
+                [GOAL_POSITIONS[t][1] for t in tiles if t and GOAL_POSITIONS[t][0] == line])
+            table[columnOffset | key] = _lineConflicts(
+                [GOAL_POSITIONS[t][0] for t in tiles if t and GOAL_POSITIONS[t][1] == line])
+    return table
+
+sharedtables.registerTable('lineConflicts', _buildLineConflictTables)
+
+def _buildWalkingDistanceTable():
+    """
+    Breadth-first search over walking-distance patterns. A pattern counts,
+    for every row, how many of its tiles belong to each goal row (3 bits per
+    count, row-major), plus the blank's row in bits 48-49. A move takes one
+    tile from a row next to the blank's into the blank's row. By the goal's
+    diagonal symmetry the same table scores columns.
+    """
+    goal = 0
+    for row in range(4):
+        goal |= (4 if row < 3 else 3) << (3 * (4 * row + row))
+    goal |= 3 << 48
+    distances = {goal: 0}
+    frontier = [goal]
+    while frontier:
+        nextFrontier = []
+        for pattern in frontier:
+            blankRow = pattern >> 48
+            counts = pattern & ((1 << 48) - 1)
+            for source in (blankRow - 1, blankRow + 1):
+                if not 0 <= source < 4:
+                    continue
+                for goalRow in range(4):
+                    if (counts >> (3 * (4 * source + goalRow))) & 7:
+                        moved = (counts - (1 << (3 * (4 * source + goalRow)))
+                                 + (1 << (3 * (4 * blankRow + goalRow))))
+                        child = moved | (source << 48)
+                        if child not in distances:
+                            distances[child] = distances[pattern] + 1
+                            nextFrontier.append(child)
+        frontier = nextFrontier
+    return distances
+
+_walkingDistanceTables = None
+
+def h6(state, problem=None):
+    """
+    Returns the Manhattan distance plus the linear-conflict penalty of every
+    row and column, read from the shared 'lineConflicts' table.
+    """
+    conflicts = sharedtables.getTable('lineConflicts')
+    packed = state.packed
+    total = incrementalH3(state)
+    for line in range(4):
+        total += conflicts[(line << 16) | ((packed >> (16 * line)) & 0xFFFF)]
+        column = packed >> (4 * line)
+        total += conflicts[((4 + line) << 16) | (column & 0xF) | ((column >> 12) & 0xF0)
+                           | ((column >> 24) & 0xF00) | ((column >> 36) & 0xF000)]
+    return total
+
+def h7(state, problem=None):
+    """Returns the walking distance: vertical plus horizontal tile-walk lower bounds."""
+    global _walkingDistanceTables
+    if _walkingDistanceTables is None:
+        distances = _buildWalkingDistanceTable()
+        vertical = [[0] * 16 for _ in range(16)]
+        horizontal = [[0] * 16 for _ in range(16)]
+        for tile in range(1, 16):
+            goal_row, goal_col = GOAL_POSITIONS[tile]
+            for cell in range(16):
+                row, col = divmod(cell, 4)
+                vertical[tile][cell] = 1 << (3 * (4 * row + goal_row))
+                horizontal[tile][cell] = 1 << (3 * (4 * col + goal_col))
+        _walkingDistanceTables = distances, vertical, horizontal
+    distances, vertical, horizontal = _walkingDistanceTables
+    packed = state.packed
+    verticalKey = (state.blank // 4) << 48
+    horizontalKey = (state.blank % 4) << 48
+    for cell in range(16):
+        tile = (packed >> (4 * cell)) & 0xF
+        verticalKey += vertical[tile][cell]
+        horizontalKey += horizontal[tile][cell]
+    return distances[verticalKey] + distances[horizontalKey]
+
+_patternDatabase = None
+
+def loadPatternDatabase(partition=patterndb.DEFAULT_PARTITION, cacheDirectory=patterndb.DEFAULT_CACHE_DIRECTORY):
+    """
+    Loads the additive pattern database used by h5, building and caching its
+    tables on disk the first time. Call this in a parent process before
+    starting workers so they only ever map the finished files.
+
+    A first build of the default 6-6-3 partition takes about ten minutes in
+    pure Python, roughly five per 6-tile table; 5-5-5 takes about a minute.
+    Run `python patterndb.py [partition]` to build the tables ahead of time.
+    """
+    global _patternDatabase
+    _patternDatabase = patterndb.loadPatternDatabase(GOAL_NUMBERS, partition, cacheDirectory)
+    return _patternDatabase
+
+def h5(state, problem=None):
+    """Returns the additive pattern database estimate (6-6-3 by default)."""
+    if _patternDatabase is None:
+        loadPatternDatabase()
+    return _patternDatabase(state, problem)
+
+# Dominance among the admissible heuristics (a <= b on every state):
+#   h1 <= h2 <= h3 and h1 <= sum(h4) <= h3   (misplaced, Euclidean, row/column, Manhattan)
+#   h3 <= h6    Manhattan + linear conflict only ever adds to Manhattan
+#   h3 <= h7    a vertical walk moves one tile one row, and likewise across
+#   h3 <= h5    each pattern table is at least its tiles' Manhattan distance
+# h2 and h4, and h5, h6 and h7 among themselves, are not comparable state by
+# state. HEURISTICS_BY_STRENGTH lists them weakest and cheapest first; pick the
+# last one whose per-node cost and table set-up fit the time budget.
+HEURISTICS_BY_STRENGTH = (h1, incrementalH4, h2, h3, h6, h7, h5)
  
 if __name__ == '__main__':
     puzzle = createRandomFifteenPuzzle(25)
     print('A random puzzle:')
     print(puzzle)
     problem = FifteenPuzzleSearchProblem(puzzle)
-    path = search.aStarSearch(problem, h1)  # A* search will use the heuristic
-    print('A* found a path of %d moves: %s' % (len(path), str(path)))
+    path, _, _ = search.aStarSearch(problem, h1)  # A* search will use the heuristic
+    print('A* found a path of %d moves: %s' % (len(path), str(moveNames(path))))
  
     # Calculate and display the number of misplaced tiles
     misplaced_tiles = h1(puzzle)
@@ -280,7 +736,7 @@ if __name__ == '__main__':
     i = 1
     for a in path:
         curr = curr.result(a)
-        print('After %d move%s: %s' % (i, ("", "s")[i > 1], a))
+        print('After %d move%s: %s' % (i, ("", "s")[i > 1], MOVE_NAMES[a]))
         print(curr)
         input("Press return for the next state...")  # wait for key stroke
         i += 1
\ No newline at end of file
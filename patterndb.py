@@ -0,0 +1,228 @@
+"""
+Additive pattern databases for the Fifteen Puzzle.
+
+The tiles are partitioned into disjoint patterns. For each pattern a table
+gives the fewest moves *of that pattern's tiles* needed to bring them home
+from any placement, found by a retrograde breadth-first search from the goal
+in which the blank slides freely through cells not owned by the pattern.
+Because every move is charged to exactly one pattern the per-pattern values
+can be added and the sum is still admissible.
+
+A placement of a k-tile pattern is indexed by packing the cell of each of its
+tiles into 4 bits, in pattern order, so a table has 16**k one-byte entries.
+Tables are written to disk with a small versioned header recording the goal
+layout and pattern, and are memory-mapped read-only on load so that every
+process solving puzzles shares the same pages.
+
+Building is slow in pure Python: about five minutes per 6-tile table, so
+some ten minutes for the default 6-6-3 partition, and about a minute for
+5-5-5. Build them once ahead of time with
+
+    python patterndb.py [6-6-3 | 5-5-5]
+"""
+
+import mmap
+import os
+import struct
+from array import array
+
+FORMAT_VERSION = 1
+MAGIC = b'PDB15\0'
+HEADER = struct.Struct('<6sHB16s16s')  # magic, version, pattern size, goal, tiles
+UNREACHED = 0xFF
+
+PARTITIONS = {
+    '6-6-3': ((1, 5, 6, 9, 10, 13), (7, 8, 11, 12, 14, 15), (2, 3, 4)),
+    '5-5-5': ((1, 2, 5, 6, 9), (3, 4, 7, 8, 12), (10, 11, 13, 14, 15)),
+}
+DEFAULT_PARTITION = '6-6-3'
+DEFAULT_CACHE_DIRECTORY = os.environ.get(
+    'PDB_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdb_cache'))
+
+_FULL = 0xFFFF
+_NOT_LEFT_COLUMN = 0xEEEE  # cells a blank can reach by moving right
+_NOT_RIGHT_COLUMN = 0x7777  # cells a blank can reach by moving left
+_NEIGHBOURS = []
+for _cell in range(16):
+    _row, _col = divmod(_cell, 4)
+    _mask = 0
+    if _row > 0:
+        _mask |= 1 << (_cell - 4)
+    if _row < 3:
+        _mask |= 1 << (_cell + 4)
+    if _col > 0:
+        _mask |= 1 << (_cell - 1)
+    if _col < 3:
+        _mask |= 1 << (_cell + 1)
+    _NEIGHBOURS.append(_mask)
+
+
+class PatternDatabaseError(Exception):
+    """Raised when a pattern database file does not match what was asked for."""
+    pass
+
+
+def _blankRegion(blank, free):
+    """Returns the mask of free cells the blank can reach from cell blank."""
+    region = 1 << blank
+    while True:
+        grown = (region | (region << 4) | (region >> 4)
+                 | ((region << 1) & _NOT_LEFT_COLUMN)
+                 | ((region >> 1) & _NOT_RIGHT_COLUMN)) & free
+        if grown == region:
+            return region
+        region = grown
+
+
+def buildPatternTable(tiles, goal):
+    """
+    Runs the retrograde breadth-first search for one pattern and returns its
+    table as a bytearray of 16**len(tiles) move counts.
+
+    Search nodes are (placement, blank region) pairs, the region being named
+    by its lowest cell. Moving the blank within its region is free; sliding a
+    pattern tile into the region costs one move and yields the next layer.
+    """
+    size = len(tiles)
+    goalCells = {value: cell for cell, value in enumerate(goal)}
+    placement = 0
+    for i, tile in enumerate(tiles):
+        placement |= goalCells[tile] << (4 * i)
+
+    table = bytearray([UNREACHED]) * (16 ** size)
+    seen = bytearray(16 ** size * 2)  # one bit per (placement, region cell)
+
+    def occupied(placement):
+        mask = 0
+        for i in range(size):
+            mask |= 1 << ((placement >> (4 * i)) & 0xF)
+        return mask
+
+    free = _FULL & ~occupied(placement)
+    region = _blankRegion(goalCells[0], free)
+    start = (placement << 4) | ((region & -region).bit_length() - 1)
+    seen[start >> 3] |= 1 << (start & 7)
+    table[placement] = 0
+    frontier = array('Q', [start])
+    depth = 0
+
+    while frontier:
+        depth += 1
+        nextFrontier = array('Q')
+        for node in frontier:
+            placement = node >> 4
+            free = _FULL & ~occupied(placement)
+            region = _blankRegion(node & 0xF, free)
+            for i in range(size):
+                shift = 4 * i
+                cell = (placement >> shift) & 0xF
+                targets = _NEIGHBOURS[cell] & region
+                while targets:
+                    bit = targets & -targets
+                    targets ^= bit
+                    target = bit.bit_length() - 1
+                    moved = placement + ((target - cell) << shift)
+                    movedRegion = _blankRegion(cell, (free | (1 << cell)) & ~bit)
+                    child = (moved << 4) | ((movedRegion & -movedRegion).bit_length() - 1)
+                    if seen[child >> 3] & (1 << (child & 7)):
+                        continue
+                    seen[child >> 3] |= 1 << (child & 7)
+                    if table[moved] == UNREACHED:
+                        table[moved] = depth
+                    nextFrontier.append(child)
+        frontier = nextFrontier
+    return table
+
+
+def _header(tiles, goal):
+    return HEADER.pack(MAGIC, FORMAT_VERSION, len(tiles), bytes(goal),
+                       bytes(tiles).ljust(16, b'\0'))
+
+
+def _tablePath(tiles, cacheDirectory):
+    name = 'pdb-v%d-%s.bin' % (FORMAT_VERSION, '-'.join(str(tile) for tile in tiles))
+    return os.path.join(cacheDirectory, name)
+
+
+def saveTable(path, tiles, goal, table):
+    """Writes a table atomically, so concurrent readers never see half a file."""
+    temporary = '%s.%d.tmp' % (path, os.getpid())
+    with open(temporary, 'wb') as file:
+        file.write(_header(tiles, goal))
+        file.write(table)
+    os.replace(temporary, path)
+
+
+def loadTable(path, tiles, goal):
+    """
+    Memory-maps a saved table read-only and returns a memoryview over its
+    entries. Raises PatternDatabaseError if the header does not match the
+    expected version, goal layout or pattern.
+    """
+    with open(path, 'rb') as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapped) != HEADER.size + 16 ** len(tiles) or \
+            mapped[:HEADER.size] != _header(tiles, goal):
+        mapped.close()
+        raise PatternDatabaseError("%s does not hold pattern %s for this goal" % (path, tiles))
+    return memoryview(mapped)[HEADER.size:]
+
+
+class AdditivePatternDatabase:
+    """
+    A heuristic summing the table values of each pattern in a partition.
+    Instances are called like the other heuristics: h(state, problem).
+    """
+
+    def __init__(self, partition, tables):
+        self.partition = partition
+        self.tables = tables
+
+    def __call__(self, state, problem=None):
+        packed = state.packed
+        cells = [0] * 16
+        for cell in range(16):
+            cells[(packed >> (4 * cell)) & 0xF] = cell
+        total = 0
+        for tiles, table in zip(self.partition, self.tables):
+            index = 0
+            shift = 0
+            for tile in tiles:
+                index |= cells[tile] << shift
+                shift += 4
+            total += table[index]
+        return total
+
+
+def loadPatternDatabase(goal, partition=DEFAULT_PARTITION, cacheDirectory=DEFAULT_CACHE_DIRECTORY):
+    """
+    Returns an AdditivePatternDatabase for goal, memory-mapping each table
+    from cacheDirectory and building (then saving) any table that is missing
+    or was written for a different version, goal or pattern.
+    """
+    if isinstance(partition, str):
+        partition = PARTITIONS[partition]
+    os.makedirs(cacheDirectory, exist_ok=True)
+    tables = []
+    for tiles in partition:
+        path = _tablePath(tiles, cacheDirectory)
+        try:
+            tables.append(loadTable(path, tiles, goal))
+            continue
+        except (OSError, ValueError, PatternDatabaseError):
+            pass
+        saveTable(path, tiles, goal, buildPatternTable(tiles, goal))
+        tables.append(loadTable(path, tiles, goal))
+    return AdditivePatternDatabase(partition, tables)
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+    from fifteenpuzzle import GOAL_NUMBERS
+
+    name = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PARTITION
+    start = time.perf_counter()
+    loadPatternDatabase(GOAL_NUMBERS, name)
+    print("Pattern database %s is ready in %s (%.0fs)"
+          % (name, DEFAULT_CACHE_DIRECTORY, time.perf_counter() - start))
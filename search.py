@@ -17,6 +17,21 @@ by Pacman agents (in searchAgents.py).
 """
  
 import util
+import copy
+import heapq
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import time
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 # Example of how it might be imported
    ##from game import Game  # Adjust based on your project structure
  
@@ -62,7 +77,84 @@ class SearchProblem:
         """
         util.raiseNotDefined()
  
+    def getGoalState(self):
+        """
+        Returns the single goal state. Only needed by the bidirectional
+        searches, which also search backwards from it.
+        """
+        util.raiseNotDefined()
+ 
+    def getReverseSuccessors(self, state):
+        """
+        state: Search state
+ 
+        Returns a list of triples, (predecessor, action, stepCost), where
+        'action' taken in 'predecessor' leads to 'state' at cost 'stepCost'.
+        Only needed by the bidirectional searches.
+        """
+        util.raiseNotDefined()
+ 
+    # Problems may also define getStateKey(state), returning a compact
+    # hashable key (such as a packed integer) that identifies the state.
+    # Closed sets then store keys instead of state objects. getStateHash(state),
+    # a well-mixed 64-bit hash that is the same in every process, lets
+    # hdaStarSearch partition states across workers evenly.
+ 
  
+class BudgetedSearchProblem:
+    """
+    Wraps a SearchProblem so that any search over it stops, by raising
+    util.TimeoutFunctionException, once timeLimit seconds have passed since
+    the wrapper was made, or util.NodeLimitException after nodeLimit
+    expansions. An expansion is a call to getSuccessors, getReverseSuccessors
+    or getActions. Unlike util.TimeoutFunction no signal is involved, so the
+    budget works the same in pool workers, threads and on every platform.
+    Everything else is passed through to the wrapped problem; its methods
+    are bound on the wrapper at first use, so later calls such as
+    isGoalState or applyAction cost no more than on the problem itself.
+    """
+    CLOCK_INTERVAL = 64  # expansions between deadline checks
+
+    def __init__(self, problem, timeLimit=None, nodeLimit=None):
+        self.problem = problem
+        self.deadline = None if timeLimit is None else time.perf_counter() + timeLimit
+        self.nodeLimit = nodeLimit
+        self.expanded = 0
+        self._successors = problem.getSuccessors
+        self._actions = getattr(problem, 'getActions', None)
+        self._limit = float('inf') if nodeLimit is None else nodeLimit
+        self._clock = float('inf') if timeLimit is None else self.deadline
+
+    def __getattr__(self, name):
+        # Only reached for names the wrapper lacks; methods are cached on the
+        # instance so the lookup and this fallback happen once per name.
+        value = getattr(self.problem, name)
+        if callable(value):
+            setattr(self, name, value)
+        return value
+
+    def _charge(self):
+        # The clock is read every CLOCK_INTERVAL expansions, as reading it
+        # costs about as much as a cheap expansion.
+        expanded = self.expanded = self.expanded + 1
+        if expanded > self._limit:
+            raise util.NodeLimitException()
+        if not expanded % self.CLOCK_INTERVAL and time.perf_counter() > self._clock:
+            raise util.TimeoutFunctionException()
+
+    def getSuccessors(self, state):
+        self._charge()
+        return self._successors(state)
+
+    def getReverseSuccessors(self, state):
+        self._charge()
+        return self.problem.getReverseSuccessors(state)
+
+    def getActions(self, state):
+        self._charge()
+        return self._actions(state)
+
+
 def tinyMazeSearch(problem):
     """
     Returns a sequence of moves that solves tinyMaze.  For any other
@@ -74,71 +166,397 @@ def tinyMazeSearch(problem):
     return  [s, s, w, s, w, w, s, w]
  
  
-def depthFirstSearch(problem):
+class SearchStats:
+    """
+    Counters and timings of one search run. Every search takes an optional
+    stats argument and attaches the instance it used to the path it returns,
+    as path.stats.
+
+    Callbacks can be registered before the search starts:
+    onExpand(state), onGenerate(successor, action, state) and onGoal(state).
+    A callback left as None costs one comparison per event. Searches that
+    mutate one state in place (IDA*) pass onGenerate copies of the successor
+    and its parent, made only when the callback is set; onExpand and onGoal
+    get the live state, valid for the duration of the call.
+    """
+
+    def __init__(self, onExpand=None, onGenerate=None, onGoal=None):
+        self.onExpand = onExpand
+        self.onGenerate = onGenerate
+        self.onGoal = onGoal
+        self.generated = 0  # successors produced
+        self.expanded = 0  # states whose successors were produced
+        self.duplicates = 0  # generated or popped states dropped as already seen
+        self.reopened = 0  # closed states put back on the fringe at a lower cost
+        self.fringeSize = 0  # live fringe size when the search stopped
+        self.maxFringeSize = 0  # peak live fringe size
+        self.heuristicCalls = 0  # states the heuristic was evaluated on
+        self.heuristicTime = 0.0  # seconds spent in the heuristic
+        self.successorTime = 0.0  # seconds spent generating successors
+        self.elapsed = 0.0  # seconds from start to finish
+        self.startTime = None
+
+    def start(self):
+        self.startTime = time.perf_counter()
+
+    def finish(self, actions):
+        """Stops the clock and returns actions as a SearchPath carrying these stats."""
+        self.elapsed = time.perf_counter() - self.startTime
+        path = SearchPath(actions)
+        path.stats = self
+        return path
+
+    def updateFringe(self, size):
+        self.fringeSize = size
+        if size > self.maxFringeSize:
+            self.maxFringeSize = size
+
+    @property
+    def nodesPerSecond(self):
+        return self.expanded / self.elapsed if self.elapsed else 0.0
+
+    def asDict(self):
+        """The counters and timings as a plain dict, e.g. for JSON reports."""
+        fields = ('generated', 'expanded', 'duplicates', 'reopened', 'fringeSize',
+                  'maxFringeSize', 'heuristicCalls', 'heuristicTime', 'successorTime', 'elapsed')
+        report = {field: getattr(self, field) for field in fields}
+        report['nodesPerSecond'] = self.nodesPerSecond
+        return report
+
+
+class SearchPath(list):
+    """A list of actions that also carries the SearchStats of the search that found it."""
+    stats = None
+
+
+def _makeClosedSet(problem, closedSet):
+    """
+    Builds the closed set for a search: closedSet is a factory called with
+    the problem's state-key function (or None), util.ExactClosedSet by
+    default; e.g. lambda key: util.TranspositionTable(256, key=key).
+    """
+    if closedSet is None:
+        closedSet = util.ExactClosedSet
+    return closedSet(getattr(problem, 'getStateKey', None))
+
+
+def depthFirstSearch(problem, closedSet=None, stats=None):
    
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
     stack = util.Stack()
-    visited = set()
+    visited = _makeClosedSet(problem, closedSet)
     stack.push((problem.getStartState(), []))  # push (state, path)
+    stats.updateFringe(1)
  
     while not stack.isEmpty():
         state, actions = stack.pop()
  
         if problem.isGoalState(state):
-            return actions
+            if stats.onGoal is not None:
+                stats.onGoal(state)
+            stats.fringeSize = len(stack)
+            return stats.finish(actions)
  
         if state not in visited:
-            visited.add(state)
+            visited.add(state, len(actions))
+            stats.expanded += 1
+            if stats.onExpand is not None:
+                stats.onExpand(state)
  
-            for successor, action, stepCost in problem.getSuccessors(state):
+            started = time.perf_counter()
+            successors = problem.getSuccessors(state)
+            stats.successorTime += time.perf_counter() - started
+            for successor, action, stepCost in successors:
+                stats.generated += 1
+                if stats.onGenerate is not None:
+                    stats.onGenerate(successor, action, state)
                 new_actions = actions + [action]
                 stack.push((successor, new_actions))
+            stats.updateFringe(len(stack))
+        else:
+            stats.duplicates += 1
  
-    return []  # Failure
+    stats.fringeSize = 0
+    return stats.finish([])  # Failure
  
  
-def breadthFirstSearch(problem):
+def breadthFirstSearch(problem, closedSet=None, stats=None):
    
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
     queue = util.Queue()
-    visited = set()
+    visited = _makeClosedSet(problem, closedSet)
     queue.push((problem.getStartState(), []))
+    stats.updateFringe(1)
  
     while not queue.isEmpty():
         state, actions = queue.pop()
  
         if problem.isGoalState(state):
-            return actions
+            if stats.onGoal is not None:
+                stats.onGoal(state)
+            stats.fringeSize = len(queue)
+            return stats.finish(actions)
  
         if state not in visited:
-            visited.add(state)
+            visited.add(state, len(actions))
+            stats.expanded += 1
+            if stats.onExpand is not None:
+                stats.onExpand(state)
  
-            for successor, action, stepCost in problem.getSuccessors(state):
+            started = time.perf_counter()
+            successors = problem.getSuccessors(state)
+            stats.successorTime += time.perf_counter() - started
+            for successor, action, stepCost in successors:
+                stats.generated += 1
+                if stats.onGenerate is not None:
+                    stats.onGenerate(successor, action, state)
                 new_actions = actions + [action]
                 queue.push((successor, new_actions))
+            stats.updateFringe(len(queue))
+        else:
+            stats.duplicates += 1
  
-    return []  # Failure
+    stats.fringeSize = 0
+    return stats.finish([])  # Failure
  
  
-def uniformCostSearch(problem):
+def uniformCostSearch(problem, closedSet=None, stats=None):
    
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
     pq = util.PriorityQueue()
-    visited = set()
+    visited = _makeClosedSet(problem, closedSet)
     pq.push((problem.getStartState(), []), 0)
+    stats.updateFringe(1)
  
     while not pq.isEmpty():
         state, actions = pq.pop()
  
         if problem.isGoalState(state):
-            return actions
+            if stats.onGoal is not None:
+                stats.onGoal(state)
+            stats.fringeSize = len(pq)
+            return stats.finish(actions)
  
         if state not in visited:
-            visited.add(state)
+            visited.add(state, len(actions))
+            stats.expanded += 1
+            if stats.onExpand is not None:
+                stats.onExpand(state)
  
-            for successor, action, stepCost in problem.getSuccessors(state):
+            started = time.perf_counter()
+            successors = problem.getSuccessors(state)
+            stats.successorTime += time.perf_counter() - started
+            for successor, action, stepCost in successors:
+                stats.generated += 1
+                if stats.onGenerate is not None:
+                    stats.onGenerate(successor, action, state)
                 new_actions = actions + [action]
                 new_cost = problem.getCostOfActions(new_actions)
                 pq.push((successor, new_actions), new_cost)
+            stats.updateFringe(len(pq))
+        else:
+            stats.duplicates += 1
  
-    return []  # Failure
+    stats.fringeSize = 0
+    return stats.finish([])  # Failure
+
+
+class _SortedRun:
+    """
+    A sorted array('Q') of state keys, held in memory or, once it outgrows
+    runSize keys, spilled to a file of native 64-bit integers. Iterating
+    reads a spilled run back one block at a time.
+    """
+    BLOCK = 1 << 16
+
+    def __init__(self, runSize, directory):
+        self.runSize = runSize
+        self.directory = directory
+        self.keys = array('Q')
+        self.filename = None
+        self.file = None
+        self.count = 0
+
+    def append(self, key):
+        self.keys.append(key)
+        self.count += 1
+        if len(self.keys) >= self.runSize:
+            self._spill()
+
+    def extend(self, keys):
+        for key in keys:
+            self.append(key)
+
+    def _spill(self):
+        if self.file is None:
+            descriptor, self.filename = tempfile.mkstemp(suffix='.run', dir=self.directory())
+            self.file = os.fdopen(descriptor, 'wb')
+        self.keys.tofile(self.file)
+        self.keys = array('Q')
+
+    def close(self):
+        """Finishes writing; a spilled run flushes its last block to disk."""
+        if self.file is not None:
+            self._spill()
+            self.file.close()
+            self.file = None
+        return self
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        if self.filename is None:
+            return iter(self.keys)
+        return self._iterFile()
+
+    def _iterFile(self):
+        with open(self.filename, 'rb') as file:
+            while True:
+                block = array('Q')
+                try:
+                    block.fromfile(file, self.BLOCK)
+                except EOFError:
+                    pass  # a short last block is still read into block
+                if not block:
+                    return
+                yield from block
+
+    def discard(self):
+        self.keys = array('Q')
+        if self.filename is not None:
+            os.remove(self.filename)
+            self.filename = None
+
+
+def _newKeys(runs, previous, current):
+    """
+    Merges sorted runs of generated keys and yields each distinct key once,
+    in order, unless it is in the sorted layers previous or current.
+    """
+    seen = heapq.merge(previous, current)
+    excluded = next(seen, None)
+    last = None
+    for key in heapq.merge(*runs):
+        if key == last:
+            continue
+        last = key
+        while excluded is not None and excluded < key:
+            excluded = next(seen, None)
+        if excluded != key:
+            yield key
+
+
+def layeredBreadthFirstSearch(problem, maxDepth=None, runSize=1 << 22, spillDirectory=None, onLayer=None,
+                              stats=None):
+    """
+    Exhaustive breadth-first search that keeps no paths and no set of state
+    objects: every layer is a sorted array('Q') of state keys. Returns the
+    number of states at each depth from the start, e.g. the distance
+    distribution of the whole state space, or up to maxDepth.
+
+    The problem's getStateKey must return integers below 2**64, and moves
+    must be reversible with unit cost, so that the neighbours of a layer lie
+    in the layers before and after it. Each new layer is then produced by
+    merging the sorted runs of generated keys and dropping those in the
+    previous two layers. Problems may define getSuccessorKeys(key), yielding
+    successor keys without building states; otherwise getStateFromKey(key)
+    is needed.
+
+    Generated keys are sorted in runs of runSize keys; runs and layers
+    longer than that are spilled to temporary files in spillDirectory (the
+    system's default temporary directory if None), so memory stays bounded
+    by a few runs. onLayer(depth, layer), if given, is called with each
+    completed layer, which can be iterated once in sorted order.
+
+    The counts come back as a list whose stats attribute holds the
+    SearchStats: expanded and generated keys, duplicates (generated keys
+    already in a layer) and the largest layer as the fringe. Its callbacks
+    are not called, as no states are built.
+    """
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
+    successorKeys = getattr(problem, 'getSuccessorKeys', None)
+    if successorKeys is None:
+        stateKey = problem.getStateKey
+        stateFromKey = problem.getStateFromKey
+
+        def successorKeys(key):
+            for successor, action, stepCost in problem.getSuccessors(stateFromKey(key)):
+                yield stateKey(successor)
+
+    created = []
+
+    def directory():
+        if not created:
+            created.append(tempfile.mkdtemp(prefix='bfs-', dir=spillDirectory))
+        return created[0]
+
+    previous = _SortedRun(runSize, directory).close()
+    current = _SortedRun(runSize, directory)
+    current.append(problem.getStateKey(problem.getStartState()))
+    current.close()
+    counts = []
+    try:
+        while len(current):
+            depth = len(counts)
+            counts.append(len(current))
+            stats.updateFringe(len(current))
+            if onLayer is not None:
+                onLayer(depth, current)
+            if maxDepth is not None and depth >= maxDepth:
+                break
+
+            runs = []
+            buffer = array('Q')
+            generated = 0
+            started = time.perf_counter()
+            for key in current:
+                buffer.extend(successorKeys(key))
+                if len(buffer) >= runSize:
+                    generated += len(buffer)
+                    runs.append(_sortedRun(buffer, runSize, directory))
+                    buffer = array('Q')
+            if buffer:
+                generated += len(buffer)
+                runs.append(_sortedRun(buffer, runSize, directory))
+            stats.successorTime += time.perf_counter() - started
+            stats.expanded += len(current)
+            stats.generated += generated
+
+            following = _SortedRun(runSize, directory)
+            following.extend(_newKeys(runs, previous, current))
+            following.close()
+            stats.duplicates += generated - len(following)
+            for run in runs:
+                run.discard()
+            previous.discard()
+            previous, current = current, following
+    finally:
+        previous.discard()
+        current.discard()
+        if created:
+            shutil.rmtree(created[0], ignore_errors=True)
+    stats.fringeSize = 0
+    return stats.finish(counts)
+
+
+def _sortedRun(keys, runSize, directory):
+    """
+    Sorts an array('Q') of generated keys, in place when numpy is available,
+    and returns it as a closed _SortedRun. Duplicates are kept for _newKeys
+    to skip while merging.
+    """
+    if numpy is not None:
+        numpy.frombuffer(keys, dtype=numpy.uint64).sort()
+    else:
+        keys = array('Q', sorted(keys))
+    run = _SortedRun(runSize, directory)
+    run.extend(keys)
+    return run.close()
  
  
 def nullHeuristic(state, problem=None):
@@ -152,40 +570,944 @@ def nullHeuristic(state, problem=None):
  
 
 
-def aStarSearch(problem, heuristic=nullHeuristic):
-    """Search the node that has the lowest combined cost and heuristic first."""
+def _reconstructPath(parents, state):
+    """
+    Follows the (parent, action) links recorded by a search back from state to
+    the start and returns the actions in forward order.
+    """
+    actions = []
+    link = parents[state]
+    while link is not None:
+        state, action = link
+        actions.append(action)
+        link = parents[state]
+    actions.reverse()
+    return actions
+
+
+def _linkedPath(link):
+    """Returns the actions of a chain of (action, parent link) pairs, ending in None, in forward order."""
+    actions = []
+    while link is not None:
+        action, link = link
+        actions.append(action)
+    actions.reverse()
+    return actions
+
+
+def aStarSearch(problem, heuristic=nullHeuristic, priorityQueue=None, closedSet=None, stats=None, weight=1):
+    """
+    Search the node that has the lowest combined cost and heuristic first.
+
+    Each fringe node carries a link (action, parent's link) instead of its
+    path, so pushes cost O(1) instead of O(depth); the path is rebuilt once,
+    when the goal is popped. Links are shared between siblings and freed
+    with the last fringe node below them, so dead branches cost nothing.
+
+    A heuristic object with a successorValue(value, state, action, successor)
+    method is only evaluated in full on the start state; every successor's
+    estimate is then derived from its parent's, which travels with the node.
+    Otherwise a heuristic object with an evaluateMany(states, problem) method
+    scores all new successors of an expanded node in one call.
+
+    priorityQueue is the fringe class. By default a util.BucketPriorityQueue
+    is used when the start state's estimate is an int, and a heap-based
+    util.PriorityQueue otherwise; if a non-integral priority turns up later
+    in a BucketPriorityQueue the fringe is moved to a heap and the search
+    carries on. Other queues get every priority as computed.
+
+    closedSet builds the set of expanded states, as for the other searches.
+    The best known g of each state is only kept while it is on the fringe,
+    keyed by the problem's getStateKey where it has one. With a bounded
+    util.TranspositionTable the closed set stays within its size, and what
+    still grows is the fringe itself, which A* cannot bound; for a hard
+    memory limit use idaStarSearch.
+    weight multiplies the heuristic in the priority; see weightedAStarSearch.
+
+    Returns (path, expanded_nodes, max_fringe_size); path.stats holds the
+    full SearchStats.
+    """
    
-    pq = util.PriorityQueue()
-    visited = set()
-    expanded_nodes = 0  # Track the number of expanded nodes
-    max_fringe_size = 0  # Track the maximum size of the priority queue
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
+    successorValue = getattr(heuristic, 'successorValue', None)
+    evaluateMany = getattr(heuristic, 'evaluateMany', None)
+    visited = _makeClosedSet(problem, closedSet)
+    stateKey = getattr(problem, 'getStateKey', None) or (lambda state: state)
+    bestCost = {}  # state key -> cheapest g found so far, for states on the fringe
     
-    pq.push((problem.getStartState(), []), 0)
+    start = problem.getStartState()
+    started = time.perf_counter()
+    start_estimate = heuristic(start, problem)
+    stats.heuristicTime += time.perf_counter() - started
+    stats.heuristicCalls += 1
+    if priorityQueue is None:
+        integral = (weight * start_estimate).__class__ is int
+        priorityQueue = util.BucketPriorityQueue if integral else util.PriorityQueue
+    pq = priorityQueue()
+    bucketed = isinstance(pq, util.BucketPriorityQueue)  # only takes int priorities
+    bestCost[stateKey(start)] = 0
+    priority = weight * start_estimate
+    if bucketed and priority.__class__ is not int:
+        pq = pq.asPriorityQueue()
+        bucketed = False
+    pq.push((start, 0, start_estimate, None), priority)
+    stats.updateFringe(1)
 
     while not pq.isEmpty():
-        # Update max fringe size
-        max_fringe_size = max(max_fringe_size, pq.count)
-        
-        state, actions = pq.pop()
+        state, cost, estimate, link = pq.pop()
         
+        if state in visited:
+            stats.duplicates += 1
+            continue  # A cheaper copy of this state was already expanded
+
         if problem.isGoalState(state):
-            return actions, expanded_nodes, max_fringe_size  # Return the solution path, expanded nodes, and max fringe size
+            if stats.onGoal is not None:
+                stats.onGoal(state)
+            stats.fringeSize = len(pq)
+            return stats.finish(_linkedPath(link)), stats.expanded, stats.maxFringeSize  # Return the solution path, expanded nodes, and max fringe size
 
-        if state not in visited:
-            visited.add(state)
-            expanded_nodes += 1  # Increment expanded nodes
+        visited.add(state, cost)
+        bestCost.pop(stateKey(state), None)  # the closed set answers for it now
+        stats.expanded += 1  # Increment expanded nodes
+        if stats.onExpand is not None:
+            stats.onExpand(state)
 
+        started = time.perf_counter()
+        successors = problem.getSuccessors(state)
+        stats.successorTime += time.perf_counter() - started
+        children = []
+        for successor, action, stepCost in successors:
+            stats.generated += 1
+            if stats.onGenerate is not None:
+                stats.onGenerate(successor, action, state)
+            if successor in visited:
+                stats.duplicates += 1
+                continue
+            new_cost = cost + stepCost
+            successorKey = stateKey(successor)
+            if new_cost < bestCost.get(successorKey, float('inf')):
+                bestCost[successorKey] = new_cost
+                children.append((successor, action, new_cost))
+            else:
+                stats.duplicates += 1
+
+        started = time.perf_counter()
+        if successorValue is not None:
+            estimates = [successorValue(estimate, state, action, successor)
+                         for successor, action, new_cost in children]
+        elif evaluateMany is not None:
+            estimates = evaluateMany([successor for successor, action, new_cost in children], problem)
+        else:
+            estimates = [heuristic(successor, problem) for successor, action, new_cost in children]
+        stats.heuristicTime += time.perf_counter() - started
+        stats.heuristicCalls += len(children)
+
+        for (successor, action, new_cost), new_estimate in zip(children, estimates):
+            priority = new_cost + weight * new_estimate
+            if bucketed and priority.__class__ is not int:
+                pq = pq.asPriorityQueue()
+                bucketed = False
+            pq.push((successor, new_cost, new_estimate, (action, link)), priority)
+        stats.updateFringe(len(pq))
+
+    stats.fringeSize = 0
+    return stats.finish([]), stats.expanded, stats.maxFringeSize  # Return failure with metrics
+
+
+def weightedAStarSearch(problem, heuristic=nullHeuristic, bound=2, closedSet=None, stats=None):
+    """
+    Weighted A*: orders the fringe by g + bound * h. With a consistent
+    heuristic the path found costs at most bound times the optimum, usually
+    after far fewer expansions. Returns (path, expanded_nodes,
+    max_fringe_size) like aStarSearch.
+    """
+    return aStarSearch(problem, heuristic, closedSet=closedSet, stats=stats, weight=bound)
+
+
+def anytimeRepairingAStarSearch(problem, heuristic=nullHeuristic, bound=1, initialWeight=3, weightStep=0.5,
+                                stats=None):
+    """
+    Anytime Repairing A* (ARA*): a generator of ever better solutions. It
+    runs weighted A* with weight initialWeight, then lowers the weight by
+    weightStep and repairs the search rather than restarting it. States whose
+    cost improves after they were expanded wait in an inconsistent list and
+    rejoin the fringe for the next weight.
+
+    After each search it yields (path, cost, suboptimality) whenever the
+    solution or its bound improved, suboptimality being a proven bound on
+    cost divided by the optimal cost. It stops once that is at most bound, so
+    the default runs down to an optimal solution; callers may stop early at
+    any time. path.stats holds the SearchStats. A heuristic with a
+    successorValue method is used incrementally, as in aStarSearch.
+    """
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
+    start = problem.getStartState()
+    if problem.isGoalState(start):
+        yield stats.finish([]), 0, 1
+        return
+    successorValue = getattr(heuristic, 'successorValue', None)
+
+    costs = {start: 0}
+    parents = {start: None}
+    estimates = {start: heuristic(start, problem)}
+    stats.heuristicCalls += 1
+    weight = initialWeight
+    fringe = util.PriorityQueue(indexed=True)
+    fringe.push(start, weight * estimates[start])
+    inconsistent = {}  # used as an ordered set
+    incumbent = None
+    incumbentCost = float('inf')
+    reported = (float('inf'), float('inf'))
+
+    while True:
+        closed = set()
+        while not fringe.isEmpty() and fringe.heap[0][0] < incumbentCost:
+            state = fringe.pop()
+            closed.add(state)
+            stats.expanded += 1
+            if stats.onExpand is not None:
+                stats.onExpand(state)
+            cost = costs[state]
+            started = time.perf_counter()
+            successors = problem.getSuccessors(state)
+            stats.successorTime += time.perf_counter() - started
+            for successor, action, stepCost in successors:
+                stats.generated += 1
+                if stats.onGenerate is not None:
+                    stats.onGenerate(successor, action, state)
+                new_cost = cost + stepCost
+                if new_cost >= costs.get(successor, float('inf')):
+                    stats.duplicates += 1
+                    continue
+                costs[successor] = new_cost
+                parents[successor] = (state, action)
+                if successor not in estimates:
+                    started = time.perf_counter()
+                    if successorValue is not None:
+                        estimates[successor] = successorValue(estimates[state], state, action, successor)
+                    else:
+                        estimates[successor] = heuristic(successor, problem)
+                    stats.heuristicTime += time.perf_counter() - started
+                    stats.heuristicCalls += 1
+                if new_cost < incumbentCost and problem.isGoalState(successor):
+                    incumbent, incumbentCost = successor, new_cost
+                if successor in closed:
+                    inconsistent[successor] = None
+                    stats.reopened += 1
+                else:
+                    fringe.update(successor, new_cost + weight * estimates[successor])
+            stats.updateFringe(len(fringe) + len(inconsistent))
+
+        if incumbent is None:
+            if fringe.isEmpty() and not inconsistent:
+                return  # Failure
+        else:
+            lower = min([costs[state] + estimates[state] for state in fringe.entries]
+                        + [costs[state] + estimates[state] for state in inconsistent], default=incumbentCost)
+            suboptimality = min(weight, incumbentCost / lower) if lower > 0 else weight
+            if (incumbentCost, suboptimality) < reported:
+                reported = (incumbentCost, suboptimality)
+                if stats.onGoal is not None:
+                    stats.onGoal(incumbent)
+                yield stats.finish(_reconstructPath(parents, incumbent)), incumbentCost, suboptimality
+            if suboptimality <= bound or weight <= 1:
+                return
+
+        weight = max(1, weight - weightStep)
+        states = list(fringe.entries) + list(inconsistent)
+        inconsistent = {}
+        fringe = util.PriorityQueue(indexed=True)
+        for state in states:
+            fringe.push(state, costs[state] + weight * estimates[state])
+
+
+def explicitEstimationSearch(problem, heuristic=nullHeuristic, bound=2, inadmissibleHeuristic=None,
+                             distanceHeuristic=None, stats=None):
+    """
+    Explicit Estimation Search (EES), a bounded-suboptimal search that
+    returns a path costing at most bound times the optimum when heuristic is
+    admissible. It keeps three views of the fringe: by f = g + h, by
+    fhat = g + hhat using the inadmissible but more accurate estimate
+    inadmissibleHeuristic, and a focal list of the nodes with fhat within
+    bound of the best fhat, ordered by distanceHeuristic, the estimated
+    number of steps to a goal. It expands the node nearest a goal when its
+    f is within bound of the lowest f; failing that the best-fhat node, and
+    failing that the lowest-f node.
+
+    distanceHeuristic defaults to heuristic, which suits unit-cost problems.
+    Without an inadmissibleHeuristic, hhat and dhat are heuristic and
+    distanceHeuristic corrected online by their average one-step error, as
+    in the original EES: after each expansion the best child's estimates
+    are compared with its parent's.
+
+    Returns (path, expanded_nodes, max_fringe_size); path.stats holds the
+    SearchStats.
+    """
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
+    distanceHeuristic = distanceHeuristic or heuristic
+    costs = {}  # state -> cheapest g found
+    expandedAt = {}  # state -> g it was last expanded at
+    parents = {}
+    estimates = {}  # state -> (h, d, hhat or None)
+    byF, byFhat, pending, focal = [], [], [], []
+    counter = 0
+    errors = [0.0, 0.0, 0]  # summed one-step errors of h and d, and their count
+
+    # Every heap entry ends with (g, state); an entry is stale once the state
+    # was reached more cheaply or expanded at this cost or less.
+    def stale(cost, state):
+        return costs[state] < cost or expandedAt.get(state, float('inf')) <= cost
+
+    def top(heap):
+        while heap and stale(heap[0][-2], heap[0][-1]):
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def estimate(state):
+        if state not in estimates:
+            started = time.perf_counter()
+            estimates[state] = (heuristic(state, problem), distanceHeuristic(state, problem),
+                                inadmissibleHeuristic(state, problem) if inadmissibleHeuristic else None)
+            stats.heuristicTime += time.perf_counter() - started
+            stats.heuristicCalls += 1
+        return estimates[state]
+
+    def add(state, cost):
+        nonlocal counter
+        h, d, hhat = estimate(state)
+        if hhat is None:
+            count = errors[2] or 1
+            distanceError = min(errors[1] / count, 0.99)
+            dhat = d / (1 - distanceError)
+            hhat = h + dhat * (errors[0] / count)
+        else:
+            dhat = d
+        counter += 1
+        heapq.heappush(byF, (cost + h, counter, cost, state))
+        heapq.heappush(byFhat, (cost + hhat, counter, cost, state))
+        heapq.heappush(pending, (cost + hhat, counter, dhat, cost, state))
+
+    start = problem.getStartState()
+    costs[start] = 0
+    parents[start] = None
+    add(start, 0)
+
+    while True:
+        bestF = top(byF)
+        if bestF is None:
+            stats.fringeSize = 0
+            return stats.finish([]), stats.expanded, stats.maxFringeSize  # Failure
+        bestFhat = top(byFhat)
+        limit = bound * bestFhat[0]
+        # Keep focal equal to the open nodes with fhat within the limit.
+        while pending and (stale(pending[0][-2], pending[0][-1]) or pending[0][0] <= limit):
+            fhat, count, dhat, cost, state = heapq.heappop(pending)
+            if not stale(cost, state):
+                heapq.heappush(focal, (dhat, fhat, count, cost, state))
+        bestDhat = top(focal)
+        while bestDhat is not None and bestDhat[1] > limit:
+            dhat, fhat, count, cost, state = heapq.heappop(focal)
+            heapq.heappush(pending, (fhat, count, dhat, cost, state))
+            bestDhat = top(focal)
+
+        fLimit = bound * bestF[0]
+        if bestDhat is not None and bestDhat[-2] + estimates[bestDhat[-1]][0] <= fLimit:
+            cost, state = bestDhat[-2], bestDhat[-1]
+        elif bestFhat[-2] + estimates[bestFhat[-1]][0] <= fLimit:
+            cost, state = bestFhat[-2], bestFhat[-1]
+        else:
+            cost, state = bestF[-2], bestF[-1]
+
+        if problem.isGoalState(state):
+            if stats.onGoal is not None:
+                stats.onGoal(state)
+            stats.fringeSize = len(byF)
+            return stats.finish(_reconstructPath(parents, state)), stats.expanded, stats.maxFringeSize
+
+        if state in expandedAt:
+            stats.reopened += 1
+        expandedAt[state] = cost
+        stats.expanded += 1
+        if stats.onExpand is not None:
+            stats.onExpand(state)
+        started = time.perf_counter()
+        successors = problem.getSuccessors(state)
+        stats.successorTime += time.perf_counter() - started
+        h, d, hhat = estimates[state]
+        bestChild = None
+        for successor, action, stepCost in successors:
+            stats.generated += 1
+            if stats.onGenerate is not None:
+                stats.onGenerate(successor, action, state)
+            new_cost = cost + stepCost
+            if parents[state] is None or successor != parents[state][0]:
+                childH, childD, childHhat = estimate(successor)
+                if bestChild is None or stepCost + childH < bestChild[0]:
+                    bestChild = (stepCost + childH, childD)
+            if new_cost >= costs.get(successor, float('inf')):
+                stats.duplicates += 1
+                continue
+            costs[successor] = new_cost
+            parents[successor] = (state, action)
+            add(successor, new_cost)
+        if bestChild is not None:
+            errors[0] += bestChild[0] - h
+            errors[1] += bestChild[1] + 1 - d
+            errors[2] += 1
+        stats.updateFringe(len(byF))
+ 
+ 
+def idaStarSearch(problem, heuristic=nullHeuristic, stats=None):
+    """
+    Iterative deepening A*: repeated depth-first searches bounded by
+    f = g + h, each raising the bound to the smallest f that exceeded the
+    previous one. Memory stays linear in the solution depth.
+
+    Problems that implement getActions(state), applyAction(state, action)
+    (returning the step cost), undoAction(state, action) and
+    reverseAction(action) are searched by mutating one copy of the start
+    state in place; any other SearchProblem falls back to getSuccessors.
+    Either way the move that would undo the previous one is pruned and
+    counted as a duplicate.
+
+    Returns (path, expanded_nodes, max_fringe_size), where the fringe is the
+    deepest stack of nodes held at once; path.stats holds the SearchStats.
+    """
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
+    if hasattr(problem, 'applyAction'):
+        path = _idaStarInPlace(problem, heuristic, stats)
+    else:
+        path = _idaStarSuccessors(problem, heuristic, stats)
+    stats.fringeSize = 0
+    return stats.finish(path), stats.expanded, stats.maxFringeSize
+
+
+def _idaStarInPlace(problem, heuristic, stats):
+    state = copy.copy(problem.getStartState())
+    path = []
+    found = object()
+    clock = time.perf_counter
+
+    def boundedSearch(cost, bound, reverse):
+        started = clock()
+        f = cost + heuristic(state, problem)
+        stats.heuristicTime += clock() - started
+        stats.heuristicCalls += 1
+        if f > bound:
+            return f
+        if problem.isGoalState(state):
+            if stats.onGoal is not None:
+                stats.onGoal(state)
+            return found
+        stats.expanded += 1
+        stats.updateFringe(len(path) + 1)
+        if stats.onExpand is not None:
+            stats.onExpand(state)
+        minimum = float('inf')
+        started = clock()
+        actions = problem.getActions(state)
+        stats.successorTime += clock() - started
+        for action in actions:
+            if action == reverse:
+                stats.duplicates += 1
+                continue
+            if stats.onGenerate is not None:
+                parent = copy.copy(state)  # the state itself is mutated again on undo
+            stepCost = problem.applyAction(state, action)
+            stats.generated += 1
+            if stats.onGenerate is not None:
+                stats.onGenerate(copy.copy(state), action, parent)
+            path.append(action)
+            t = boundedSearch(cost + stepCost, bound, problem.reverseAction(action))
+            if t is found:
+                return found
+            path.pop()
+            problem.undoAction(state, action)
+            if t < minimum:
+                minimum = t
+        return minimum
+
+    bound = heuristic(state, problem)
+    while True:
+        t = boundedSearch(0, bound, None)
+        if t is found:
+            return path
+        if t == float('inf'):
+            return []  # Failure
+        bound = t
+
+
+def _idaStarSuccessors(problem, heuristic, stats):
+    start = problem.getStartState()
+    path = []
+    found = object()
+    clock = time.perf_counter
+
+    def boundedSearch(state, cost, bound, previous):
+        started = clock()
+        f = cost + heuristic(state, problem)
+        stats.heuristicTime += clock() - started
+        stats.heuristicCalls += 1
+        if f > bound:
+            return f
+        if problem.isGoalState(state):
+            if stats.onGoal is not None:
+                stats.onGoal(state)
+            return found
+        stats.expanded += 1
+        stats.updateFringe(len(path) + 1)
+        if stats.onExpand is not None:
+            stats.onExpand(state)
+        minimum = float('inf')
+        started = clock()
+        successors = problem.getSuccessors(state)
+        stats.successorTime += clock() - started
+        for successor, action, stepCost in successors:
+            if previous is not None and successor == previous:
+                stats.duplicates += 1
+                continue
+            stats.generated += 1
+            if stats.onGenerate is not None:
+                stats.onGenerate(successor, action, state)
+            path.append(action)
+            t = boundedSearch(successor, cost + stepCost, bound, state)
+            if t is found:
+                return found
+            path.pop()
+            if t < minimum:
+                minimum = t
+        return minimum
+
+    bound = heuristic(start, problem)
+    while True:
+        t = boundedSearch(start, 0, bound, None)
+        if t is found:
+            return path
+        if t == float('inf'):
+            return []  # Failure
+        bound = t
+
+ 
+ 
+def _joinPaths(forwardParents, backwardParents, meeting):
+    """
+    Joins the forward path from the start to meeting with the path from
+    meeting to the goal recorded by a backward search, whose links are
+    (next state toward the goal, action taken to reach it).
+    """
+    actions = _reconstructPath(forwardParents, meeting)
+    link = backwardParents[meeting]
+    while link is not None:
+        meeting, action = link
+        actions.append(action)
+        link = backwardParents[meeting]
+    return actions
+
+
+def bidirectionalSearch(problem, stats=None):
+    """
+    Breadth-first search from the start and the goal at once, for problems
+    with unit step costs that implement getGoalState and
+    getReverseSuccessors. Whole layers of the smaller frontier are expanded
+    in turn, and the cheapest meeting found in a layer is optimal.
+
+    Returns (path, expanded_nodes, max_fringe_size); path.stats holds the
+    SearchStats.
+    """
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
+    start = problem.getStartState()
+    goal = problem.getGoalState()
+    forwardParents = {start: None}
+    backwardParents = {goal: None}
+    forwardDepth = {start: 0}
+    backwardDepth = {goal: 0}
+    forwardFrontier = [start]
+    backwardFrontier = [goal]
+    stats.updateFringe(1 if start == goal else 2)
+
+    if start == goal:
+        return stats.finish([]), stats.expanded, stats.maxFringeSize
+
+    while forwardFrontier and backwardFrontier:
+        stats.updateFringe(len(forwardFrontier) + len(backwardFrontier))
+        forward = len(forwardFrontier) <= len(backwardFrontier)
+        if forward:
+            frontier, parents, depths = forwardFrontier, forwardParents, forwardDepth
+            otherDepths = backwardDepth
+            expand = problem.getSuccessors
+        else:
+            frontier, parents, depths = backwardFrontier, backwardParents, backwardDepth
+            otherDepths = forwardDepth
+            expand = problem.getReverseSuccessors
+
+        best = None
+        nextFrontier = []
+        for state in frontier:
+            stats.expanded += 1
+            if stats.onExpand is not None:
+                stats.onExpand(state)
+            depth = depths[state] + 1
+            started = time.perf_counter()
+            neighbours = expand(state)
+            stats.successorTime += time.perf_counter() - started
+            for neighbour, action, stepCost in neighbours:
+                stats.generated += 1
+                if stats.onGenerate is not None:
+                    stats.onGenerate(neighbour, action, state)
+                if neighbour in depths:
+                    stats.duplicates += 1
+                    continue
+                depths[neighbour] = depth
+                parents[neighbour] = (state, action)
+                nextFrontier.append(neighbour)
+                if neighbour in otherDepths:
+                    total = depth + otherDepths[neighbour]
+                    if best is None or total < best[0]:
+                        best = (total, neighbour)
+        if best is not None:
+            if stats.onGoal is not None:
+                stats.onGoal(best[1])
+            path = _joinPaths(forwardParents, backwardParents, best[1])
+            return stats.finish(path), stats.expanded, stats.maxFringeSize
+
+        if forward:
+            forwardFrontier = nextFrontier
+        else:
+            backwardFrontier = nextFrontier
+
+    stats.fringeSize = 0
+    return stats.finish([]), stats.expanded, stats.maxFringeSize  # Failure
+
+
+def bidirectionalMMSearch(problem, heuristic=nullHeuristic, reverseHeuristic=nullHeuristic, stats=None):
+    """
+    The MM bidirectional heuristic search: each direction orders its fringe
+    by max(g + h, 2g), so neither search passes the midpoint of an optimal
+    path, and the direction with the lower minimum is expanded next.
+    heuristic estimates the cost to the goal; reverseHeuristic estimates the
+    cost back to the start and guides the backward search. With both left
+    as nullHeuristic this is the uninformed MM0.
+
+    The search stops once the cheapest meeting found costs no more than the
+    smaller fringe minimum, which bounds any undiscovered solution. Returns
+    (path, expanded_nodes, max_fringe_size); path.stats holds the
+    SearchStats.
+    """
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
+    start = problem.getStartState()
+    goal = problem.getGoalState()
+    forward = (util.PriorityQueue(), {start: 0}, {start: None}, set(),
+               problem.getSuccessors, heuristic)
+    backward = (util.PriorityQueue(), {goal: 0}, {goal: None}, set(),
+                problem.getReverseSuccessors, reverseHeuristic)
+    forward[0].push((start, 0), heuristic(start, problem))
+    backward[0].push((goal, 0), reverseHeuristic(goal, problem))
+    stats.heuristicCalls += 2
+    stats.updateFringe(2)
+    bestCost = 0 if start == goal else float('inf')
+    meeting = start if start == goal else None
+
+    while not forward[0].isEmpty() and not backward[0].isEmpty():
+        forwardMinimum = forward[0].heap[0][0]
+        backwardMinimum = backward[0].heap[0][0]
+        if bestCost <= min(forwardMinimum, backwardMinimum):
+            break
+        if forwardMinimum <= backwardMinimum:
+            (fringe, costs, parents, closed, expand, estimate), other = forward, backward
+        else:
+            (fringe, costs, parents, closed, expand, estimate), other = backward, forward
+        otherCosts = other[1]
+
+        state, cost = fringe.pop()
+        if state in closed or cost > costs[state]:
+            stats.duplicates += 1
+            continue  # Stale fringe entry
+        closed.add(state)
+        stats.expanded += 1
+        if stats.onExpand is not None:
+            stats.onExpand(state)
+
+        started = time.perf_counter()
+        neighbours = expand(state)
+        stats.successorTime += time.perf_counter() - started
+        for neighbour, action, stepCost in neighbours:
+            stats.generated += 1
+            if stats.onGenerate is not None:
+                stats.onGenerate(neighbour, action, state)
+            new_cost = cost + stepCost
+            if new_cost >= costs.get(neighbour, float('inf')):
+                stats.duplicates += 1
+                continue
+            costs[neighbour] = new_cost
+            parents[neighbour] = (state, action)
+            if neighbour in closed:
+                closed.discard(neighbour)
+                stats.reopened += 1
+            started = time.perf_counter()
+            neighbourEstimate = estimate(neighbour, problem)
+            stats.heuristicTime += time.perf_counter() - started
+            stats.heuristicCalls += 1
+            fringe.push((neighbour, new_cost), max(new_cost + neighbourEstimate, 2 * new_cost))
+            if neighbour in otherCosts and new_cost + otherCosts[neighbour] < bestCost:
+                bestCost = new_cost + otherCosts[neighbour]
+                meeting = neighbour
+        stats.updateFringe(len(forward[0]) + len(backward[0]))
+
+    stats.fringeSize = len(forward[0]) + len(backward[0])
+    if meeting is None:
+        return stats.finish([]), stats.expanded, stats.maxFringeSize  # Failure
+    if stats.onGoal is not None:
+        stats.onGoal(meeting)
+    return stats.finish(_joinPaths(forward[2], backward[2], meeting)), stats.expanded, stats.maxFringeSize
+
+
+def _ownerFunction(problem, workers):
+    """
+    Returns state -> index of the worker that owns it. Problems that define
+    getStateHash(state) (a well-mixed 64-bit hash, such as a Zobrist hash)
+    are partitioned on it directly; otherwise the hash of the state key is
+    scrambled first, since hashes of packed boards vary little in their low
+    bits.
+    """
+    stateHash = getattr(problem, 'getStateHash', None)
+    if stateHash is not None:
+        return lambda state: stateHash(state) % workers
+    key = getattr(problem, 'getStateKey', None) or (lambda state: state)
+    return lambda state: (((hash(key(state)) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32) % workers
+
+
+def _hdaStarWorker(index, problem, heuristic, workers, batchSize, inboxes, results,
+                   incumbent, goals, minima, sent, received, idle):
+    """
+    One HDA* process. It owns the states that hash to its index: their best
+    g, their parent link and their open-list entries. Successors owned by
+    other workers are buffered per owner and sent in batches. Messages on
+    its inbox are ('nodes', [(state, g, parentKey, parentOwner, action)]),
+    ('trace', key) and ('stop',).
+
+    Each worker publishes the lowest f on its fringe in minima and only
+    expands while that is the lowest of all. Unsynchronized workers would
+    otherwise run ahead into f-layers beyond the optimal cost, and flood the
+    others with the nodes they generate there.
+    """
+    try:
+        owner = _ownerFunction(problem, workers)
+        key = getattr(problem, 'getStateKey', None) or (lambda state: state)
+        inbox = inboxes[index]
+        fringe = util.PriorityQueue()
+        best = {}  # key -> (g, parent key, parent owner, action)
+        outgoing = [[] for _ in range(workers)]
+        expanded = generated = maxFringeSize = 0
+        polled = 0
+
+        def receive(nodes):
+            for state, g, parentKey, parentOwner, action in nodes:
+                stateKey = key(state)
+                known = best.get(stateKey)
+                if known is not None and known[0] <= g:
+                    continue
+                best[stateKey] = (g, parentKey, parentOwner, action)
+                # Ties on f go to the deepest node, as with aStarSearch's bucket queue.
+                fringe.push((state, g), (g + heuristic(state, problem), -g))
+
+        def flush():
+            for destination, nodes in enumerate(outgoing):
+                if nodes:
+                    sent[index] += 1
+                    inboxes[destination].put(('nodes', nodes))
+                    outgoing[destination] = []
+
+        while True:
+            lowest = fringe.heap[0][0][0] if not fringe.isEmpty() else float('inf')
+            minima[index] = lowest
+            busy = lowest < incumbent.value
+            ready = busy and lowest <= min(minima)
+            message = None
+            polled += 1
+            if not ready or polled % 16 == 0:
+                if not ready:
+                    flush()
+                try:
+                    message = inbox.get_nowait() if ready else inbox.get(timeout=0.01 if not busy else 0.001)
+                except queue.Empty:
+                    pass
+            if message is not None:
+                idle[index] = 0
+                kind = message[0]
+                if kind == 'nodes':
+                    received[index] += 1
+                    receive(message[1])
+                elif kind == 'trace':
+                    g, parentKey, parentOwner, action = best[message[1]]
+                    results.put(('link', message[1], parentKey, parentOwner, action))
+                else:
+                    results.put(('stats', index, expanded, generated, maxFringeSize))
+                    return
+                continue
+
+            if not busy:
+                idle[index] = 1
+                continue
+            if not ready:
+                continue
+
+            state, g = fringe.pop()
+            stateKey = key(state)
+            if best[stateKey][0] < g:
+                continue  # A cheaper copy was received since this one was pushed
+            if problem.isGoalState(state):
+                with incumbent.get_lock():
+                    improved = g < incumbent.value
+                    if improved:
+                        incumbent.value = g
+                if improved:
+                    goals[index] += 1
+                    results.put(('goal', g, stateKey, index))
+                continue
+            expanded += 1
             for successor, action, stepCost in problem.getSuccessors(state):
-                new_actions = actions + [action]
-                cost = problem.getCostOfActions(new_actions) + heuristic(successor, problem)
-                pq.push((successor, new_actions), cost)
+                generated += 1
+                node = (successor, g + stepCost, stateKey, index, action)
+                destination = owner(successor)
+                if destination == index:
+                    receive((node,))
+                else:
+                    outgoing[destination].append(node)
+                    if len(outgoing[destination]) >= batchSize:
+                        sent[index] += 1
+                        inboxes[destination].put(('nodes', outgoing[destination]))
+                        outgoing[destination] = []
+            if expanded % batchSize == 0:
+                flush()
+            maxFringeSize = max(maxFringeSize, len(fringe))
+    except BaseException:
+        import traceback
+        results.put(('error', index, traceback.format_exc()))
+
+
+def hdaStarSearch(problem, heuristic=nullHeuristic, workers=None, batchSize=64, stats=None):
+    """
+    Hash-distributed A* (HDA*): one search spread over several processes.
+    Every state is owned by the worker its hash maps to, which alone keeps
+    its best cost and parent, so duplicates are detected without locks.
+    Workers send generated nodes to their owners in batches over
+    multiprocessing queues.
+
+    A goal only sets the incumbent cost. Workers carry on while they hold
+    nodes with f below it, and the search ends once every worker is idle
+    and every batch sent has been received. With an admissible heuristic
+    the incumbent is then optimal. The path is traced back link by link by
+    asking each state's owner for its parent.
+
+    problem and heuristic are passed to the worker processes, so with the
+    spawn start method they must be picklable. Returns (path,
+    expanded_nodes, max_fringe_size), the fringe size being the sum of the
+    workers' peaks. path.stats holds the SearchStats, which counts
+    expansions and generated nodes but calls no hooks.
+    """
+    stats = stats if stats is not None else SearchStats()
+    stats.start()
+    workers = workers or os.cpu_count() or 1
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in range(workers)]
+    results = context.Queue()
+    incumbent = context.Value('d', float('inf'))
+    goals = context.RawArray('q', workers)  # goal messages put on results
+    minima = context.RawArray('d', [float('inf')] * workers)  # lowest f on each fringe
+    sent = context.RawArray('q', workers + 1)  # the last slot counts the start batch
+    received = context.RawArray('q', workers)
+    idle = context.RawArray('b', workers)
+    processes = [context.Process(target=_hdaStarWorker,
+                                 args=(index, problem, heuristic, workers, batchSize, inboxes,
+                                       results, incumbent, goals, minima, sent, received, idle), daemon=True)
+                 for index in range(workers)]
+    for process in processes:
+        process.start()
+
+    def checkWorkers():
+        if not all(process.is_alive() for process in processes):
+            nextResult()  # surfaces the worker's traceback, if it sent one
+            raise RuntimeError("an HDA* worker exited unexpectedly")
+
+    def nextResult():
+        while True:
+            try:
+                message = results.get(timeout=0.1)
+            except queue.Empty:
+                if not all(process.is_alive() for process in processes):
+                    raise RuntimeError("an HDA* worker exited unexpectedly")
+                continue
+            if message[0] == 'error':
+                raise RuntimeError("HDA* worker %d failed:\n%s" % message[1:])
+            return message
+
+    try:
+        start = problem.getStartState()
+        sent[workers] = 1
+        inboxes[_ownerFunction(problem, workers)(start)].put(('nodes', [(start, 0, None, None, None)]))
+
+        # Two identical snapshots with every worker idle and as many batches
+        # received as sent: no worker can become busy again.
+        previous = None
+        while True:
+            time.sleep(0.005)
+            snapshot = (tuple(idle), tuple(sent), tuple(received))
+            if all(snapshot[0]) and sum(snapshot[1]) == sum(snapshot[2]) and snapshot == previous:
+                break
+            previous = snapshot
+            checkWorkers()
+        goal = None
+        for _ in range(sum(goals)):
+            message = nextResult()
+            if goal is None or message[1] < goal[0]:
+                goal = message[1:]
 
-    return [], expanded_nodes, max_fringe_size  # Return failure with metrics
+        path = []
+        if goal is not None:
+            if stats.onGoal is not None:
+                stats.onGoal(goal[1])
+            stateKey, owner = goal[1], goal[2]
+            while True:
+                inboxes[owner].put(('trace', stateKey))
+                _, _, parentKey, parentOwner, action = nextResult()
+                if parentKey is None:
+                    break
+                path.append(action)
+                stateKey, owner = parentKey, parentOwner
+            path.reverse()
 
+        for inbox in inboxes:
+            inbox.put(('stop',))
+        for _ in range(workers):
+            _, index, expanded, generated, maxFringeSize = nextResult()
+            stats.expanded += expanded
+            stats.generated += generated
+            stats.maxFringeSize += maxFringeSize
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+    return stats.finish(path), stats.expanded, stats.maxFringeSize
  
  
 # Abbreviations for search algorithms
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
+idastar = idaStarSearch
+bidirectional = bidirectionalSearch
+mm = bidirectionalMMSearch
+hdastar = hdaStarSearch
 ucs = uniformCostSearch
+lbfs = layeredBreadthFirstSearch
+wastar = weightedAStarSearch
+arastar = anytimeRepairingAStarSearch
+ees = explicitEstimationSearch
@@ -0,0 +1,146 @@
+"""
+Lookup tables built once and shared between processes.
+
+A heuristic registers each table it needs under a name, with a function
+that builds it as a flat array.array, bytes or bytearray, and reads it with
+getTable(name). On its own a process builds the table on first use. A pool
+parent instead calls publishTables() before starting its workers: every
+table it has built is copied into a multiprocessing.shared_memory block,
+and the returned manifest, a small picklable dict, goes to the pool
+initializer, which calls attachTables(manifest). From then on getTable in
+the worker returns a zero-copy memoryview of the parent's block, and
+tableArray a numpy view of it, so a table costs its memory once however many
+workers there are.
+
+Pattern databases do not need this: patterndb memory-maps them from files,
+which the operating system already shares.
+"""
+
+import atexit
+import os
+from multiprocessing import shared_memory, util as multiprocessingUtil
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_builders = {}  # name -> function building the table
+_tables = {}  # name -> (table or block view, memoryview of the whole block or None)
+_blocks = {}  # name -> SharedMemory holding the table, created or attached here
+_owner = None  # pid of the process that created the blocks and must unlink them
+_publications = 0  # publishTables calls not yet matched by releaseTables
+
+
+def registerTable(name, build):
+    """Registers the function that builds a table; it is only called when the table is first needed."""
+    _builders[name] = build
+
+
+def getTable(name):
+    """
+    Returns a table as an indexable sequence: the shared block's view if the
+    table was published or attached, otherwise a table built here.
+    """
+    entry = _tables.get(name)
+    if entry is None:
+        entry = _tables[name] = (_builders[name](), None)
+    return entry[0]
+
+
+def tableArray(name):
+    """Returns a table as a one-dimensional numpy array sharing its memory; requires numpy."""
+    if numpy is None:
+        raise ImportError("tableArray requires numpy")
+    return numpy.asarray(memoryview(getTable(name)))
+
+
+def _format(table):
+    view = memoryview(table)
+    return view.format, view.nbytes
+
+
+def _view(block, format, size):
+    whole = block.buf[:size]
+    return whole.cast(format), whole
+
+
+def publishTables(names=None):
+    """
+    Copies tables into shared memory and returns the manifest for
+    attachTables. names defaults to every registered table this process has
+    already built, e.g. by evaluating the pool's heuristics once. Tables that
+    are already published are reused; each call must be matched by
+    releaseTables once the workers are done.
+    """
+    global _owner, _publications
+    if names is None:
+        names = [name for name in _builders if name in _tables]
+    if _owner != os.getpid():
+        _blocks.clear()
+        _owner = os.getpid()
+    manifest = {}
+    for name in names:
+        block = _blocks.get(name)
+        if block is None:
+            table = getTable(name)
+            format, size = _format(table)
+            block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+            block.buf[:size] = memoryview(table).cast('B')
+            _blocks[name] = block
+            _tables[name] = _view(block, format, size)
+        table, whole = _tables[name]
+        manifest[name] = (block.name, table.format, whole.nbytes)
+    _publications += 1
+    return manifest
+
+
+def attachTables(manifest):
+    """
+    Maps the tables of a publishTables manifest into this process; meant for
+    a pool initializer. The blocks are closed again when the process exits.
+    """
+    for name, (blockName, format, size) in manifest.items():
+        block = _blocks.get(name)
+        if block is not None and block.name == blockName:
+            continue  # inherited from the parent by fork
+        block = shared_memory.SharedMemory(name=blockName)
+        _blocks[name] = block
+        _tables[name] = _view(block, format, size)
+    multiprocessingUtil.Finalize(None, _releaseAll, exitpriority=0)
+
+
+def releaseTables():
+    """
+    Ends one publishTables call. When none remain, the shared blocks are
+    closed and, in the process that created them, unlinked; that process
+    keeps private copies for later getTable calls.
+    """
+    global _publications
+    if _publications > 0:
+        _publications -= 1
+        if _publications == 0:
+            _releaseAll()
+
+
+def _releaseAll():
+    global _publications
+    _publications = 0
+    owner = _owner == os.getpid()
+    for name, block in list(_blocks.items()):
+        table, whole = _tables.pop(name, (None, None))
+        if owner and whole is not None:
+            _tables[name] = (memoryview(bytes(whole)).cast(table.format), None)
+        try:
+            if whole is not None:
+                table.release()
+                whole.release()
+            block.close()
+        except BufferError:
+            pass  # a caller still holds a view; the mapping goes when the process exits
+        if owner:
+            block.unlink()
+    _blocks.clear()
+
+
+atexit.register(_releaseAll)
@@ -0,0 +1,379 @@
+"""
+Sliding puzzles of any size: the 8-puzzle (3x3), the Fifteen Puzzle (4x4),
+the 24-puzzle (5x5) and rectangular boards.
+
+Everything that depends on the board size lives in a SlidingPuzzleLayout,
+built once per (rows, cols) and shared by every state of that size: the
+packed encoding, the goal, the move tables and the per-tile heuristic
+tables. The encoding generalizes FifteenPuzzleState's: the tile in cell i
+is stored in bits [b*i, b*i + b) of one integer, b being just wide enough
+for the largest tile (4 bits up to 15 tiles, 5 bits up to 31).
+
+fifteenpuzzle.py stays the specialized 4x4 implementation; the move codes
+and their names are shared with it.
+"""
+
+import search
+import random
+from fifteenpuzzle import MOVE_NAMES, REVERSE_MOVE_CODES, moveNames, _lineConflicts
+
+
+class SlidingPuzzleLayout:
+    """
+    The tables for one board size. The goal holds the tiles 1 .. n-1 in
+    reading order with the blank last. Use layoutFor(rows, cols) rather than
+    building layouts directly, so states of one size share theirs.
+    """
+
+    def __init__(self, rows, cols):
+        if rows < 2 or cols < 2:
+            raise ValueError("a sliding puzzle needs at least 2 rows and 2 columns")
+        self.rows = rows
+        self.cols = cols
+        self.size = size = rows * cols
+        self.bits = bits = (size - 1).bit_length()
+        self.mask = (1 << bits) - 1
+        self.goalNumbers = list(range(1, size)) + [0]
+        self.goalPacked = self.pack(self.goalNumbers)
+        self.goalRows = [0] * size  # tile -> goal row
+        self.goalCols = [0] * size  # tile -> goal column
+        for cell, tile in enumerate(self.goalNumbers):
+            self.goalRows[tile], self.goalCols[tile] = divmod(cell, cols)
+
+        # The same tables as fifteenpuzzle's, for this width: per blank cell,
+        # the legal move codes and names, {move code or name: target cell},
+        # and (code, target, bit shift of target, packed delta per unit of tile).
+        offsets = (-cols, cols, -1, 1)
+        self.moveTargets = []
+        self.legalMoves = []
+        self.legalMoveNames = []
+        self.successorMoves = []
+        for blank in range(size):
+            row, col = divmod(blank, cols)
+            legal = [code for code, allowed in
+                     enumerate((row > 0, row < rows - 1, col > 0, col < cols - 1)) if allowed]
+            targets = {}
+            moves = []
+            for code in legal:
+                target = blank + offsets[code]
+                targets[code] = targets[MOVE_NAMES[code]] = target
+                moves.append((code, target, bits * target, (1 << (bits * blank)) - (1 << (bits * target))))
+            self.moveTargets.append(targets)
+            self.legalMoves.append(tuple(legal))
+            self.legalMoveNames.append(tuple(MOVE_NAMES[code] for code in legal))
+            self.successorMoves.append(tuple(moves))
+
+        # tile -> cell -> cost, the blank's entries left at zero
+        self.misplacedCosts = [[0] * size for _ in range(size)]
+        self.manhattanCosts = [[0] * size for _ in range(size)]
+        for tile in range(1, size):
+            for cell in range(size):
+                row, col = divmod(cell, cols)
+                self.misplacedCosts[tile][cell] = int(cell != tile - 1)
+                self.manhattanCosts[tile][cell] = abs(row - self.goalRows[tile]) + abs(col - self.goalCols[tile])
+
+    def pack(self, numbers):
+        """Packs a flat row-major list of tiles into this layout's integer encoding."""
+        packed = 0
+        bits = self.bits
+        for index, value in enumerate(numbers):
+            packed |= value << (bits * index)
+        return packed
+
+    def unpack(self, packed):
+        """Returns the tiles of a packed board as a flat row-major list."""
+        bits = self.bits
+        mask = self.mask
+        return [(packed >> (bits * index)) & mask for index in range(self.size)]
+
+
+_layouts = {}
+
+def layoutFor(rows, cols):
+    """Returns the shared SlidingPuzzleLayout for a board size, building it on first use."""
+    layout = _layouts.get((rows, cols))
+    if layout is None:
+        layout = _layouts[(rows, cols)] = SlidingPuzzleLayout(rows, cols)
+    return layout
+
+
+class SlidingPuzzleState:
+    """
+    A rows x cols sliding puzzle. numbers is the flat row-major board, 0
+    for the blank; left out, the state is the goal. Like FifteenPuzzleState
+    the board is one packed integer with the blank's index cached, so a move
+    is a single field swap.
+    """
+    __slots__ = ('layout', 'packed', 'blank')
+
+    def __init__(self, rows, cols, numbers=None):
+        layout = layoutFor(rows, cols)
+        if numbers is None:
+            numbers = layout.goalNumbers
+        if sorted(numbers) != list(range(layout.size)):
+            raise ValueError("a %dx%d board needs the tiles 0-%d once each" % (rows, cols, layout.size - 1))
+        self.layout = layout
+        self.packed = layout.pack(numbers)
+        self.blank = list(numbers).index(0)
+
+    @classmethod
+    def fromPacked(cls, layout, packed, blank=None):
+        """Builds a state directly from its packed encoding."""
+        state = cls.__new__(cls)
+        if blank is None:
+            blank = 0
+            while (packed >> (layout.bits * blank)) & layout.mask:
+                blank += 1
+        state.layout = layout
+        state.packed = packed
+        state.blank = blank
+        return state
+
+    @property
+    def rows(self):
+        return self.layout.rows
+
+    @property
+    def cols(self):
+        return self.layout.cols
+
+    @property
+    def blankLocation(self):
+        return divmod(self.blank, self.layout.cols)
+
+    def numbers(self):
+        """Returns the tiles as a flat row-major list."""
+        return self.layout.unpack(self.packed)
+
+    def isGoal(self):
+        return self.packed == self.layout.goalPacked
+
+    def legalMoves(self):
+        """Returns a list of legal moves from the current state."""
+        return list(self.layout.legalMoveNames[self.blank])
+
+    def result(self, move):
+        """Returns the state reached by a move, given as a name or a move code."""
+        layout = self.layout
+        blank = self.blank
+        try:
+            target = layout.moveTargets[blank][move]
+        except KeyError:
+            raise ValueError("Illegal Move")
+        bits = layout.bits
+        tile = (self.packed >> (bits * target)) & layout.mask
+        return SlidingPuzzleState.fromPacked(
+            layout, self.packed + (tile << (bits * blank)) - (tile << (bits * target)), target)
+
+    def applyMove(self, move):
+        """
+        Slides a tile in place. As with FifteenPuzzleState.applyMove, a state
+        must not be mutated while it is stored in a set or dict.
+        """
+        layout = self.layout
+        blank = self.blank
+        try:
+            target = layout.moveTargets[blank][move]
+        except KeyError:
+            raise ValueError("Illegal Move")
+        bits = layout.bits
+        tile = (self.packed >> (bits * target)) & layout.mask
+        self.packed += (tile << (bits * blank)) - (tile << (bits * target))
+        self.blank = target
+
+    def __eq__(self, other):
+        if not isinstance(other, SlidingPuzzleState):
+            return NotImplemented
+        return self.layout is other.layout and self.packed == other.packed
+
+    def __hash__(self):
+        return hash(self.packed)
+
+    def __reduce__(self):
+        return (_unpickleState, (self.layout.rows, self.layout.cols, self.packed, self.blank))
+
+    def __str__(self):
+        layout = self.layout
+        width = len(str(layout.size - 1))
+        horizontalLine = '-' * ((width + 2) * layout.cols + 1)
+        numbers = self.numbers()
+        lines = [horizontalLine]
+        for row in range(layout.rows):
+            cells = numbers[row * layout.cols:(row + 1) * layout.cols]
+            lines.append('|' + '|'.join(' %*s' % (width, tile or '') for tile in cells) + '|')
+            lines.append(horizontalLine)
+        return '\n'.join(lines)
+
+
+def _unpickleState(rows, cols, packed, blank):
+    return SlidingPuzzleState.fromPacked(layoutFor(rows, cols), packed, blank)
+
+
+class SlidingPuzzleSearchProblem(search.SearchProblem):
+    """
+    The SearchProblem for a sliding puzzle of any size, with the same
+    interface as FifteenPuzzleSearchProblem: move codes as actions, a
+    successor generator, and the in-place protocol that lets
+    search.idaStarSearch keep a single state, which is what makes the
+    24-puzzle tractable in memory.
+    """
+
+    def __init__(self, puzzle):
+        self.puzzle = puzzle
+
+    def getStartState(self):
+        return self.puzzle
+
+    def isGoalState(self, state):
+        return state.isGoal()
+
+    def getSuccessors(self, state):
+        return list(self.iterSuccessors(state))
+
+    def iterSuccessors(self, state):
+        """Yields the (successor, action, stepCost) triples one at a time."""
+        layout = state.layout
+        packed = state.packed
+        mask = layout.mask
+        new = SlidingPuzzleState.__new__
+        for action, target, shift, delta in layout.successorMoves[state.blank]:
+            successor = new(SlidingPuzzleState)
+            successor.layout = layout
+            successor.packed = packed + ((packed >> shift) & mask) * delta
+            successor.blank = target
+            yield successor, action, 1
+
+    def getCostOfActions(self, actions):
+        return len(actions)
+
+    def getStateKey(self, state):
+        return state.packed
+
+    def getStateFromKey(self, key):
+        return SlidingPuzzleState.fromPacked(self.puzzle.layout, key)
+
+    def getSuccessorKeys(self, key):
+        """
+        The packed boards of a packed board's successors. Boards of up to 16
+        cells fit the 64-bit keys of search.layeredBreadthFirstSearch.
+        """
+        layout = self.puzzle.layout
+        bits = layout.bits
+        mask = layout.mask
+        blank = 0
+        while (key >> (bits * blank)) & mask:
+            blank += 1
+        return [key + ((key >> shift) & mask) * delta
+                for action, target, shift, delta in layout.successorMoves[blank]]
+
+    def getGoalState(self):
+        layout = self.puzzle.layout
+        return SlidingPuzzleState.fromPacked(layout, layout.goalPacked, layout.size - 1)
+
+    def getReverseSuccessors(self, state):
+        return [(successor, REVERSE_MOVE_CODES[action], 1)
+                for successor, action, stepCost in self.iterSuccessors(state)]
+
+    def getActions(self, state):
+        return state.layout.legalMoves[state.blank]
+
+    def applyAction(self, state, action):
+        state.applyMove(action)
+        return 1
+
+    def undoAction(self, state, action):
+        state.applyMove(REVERSE_MOVE_CODES[action])
+
+    def reverseAction(self, action):
+        return REVERSE_MOVE_CODES[action]
+
+
+def is_solvable(puzzle):
+    """
+    Returns whether a SlidingPuzzleState can reach its goal. With an odd
+    width that holds exactly when the tile permutation (blank left out, in
+    reading order) is even; with an even width its parity must also match
+    the number of rows between the blank and the bottom row.
+    """
+    layout = puzzle.layout
+    tiles = [tile - 1 for tile in puzzle.numbers() if tile]
+    cycles = 0
+    seen = [False] * len(tiles)
+    for start in range(len(tiles)):
+        if not seen[start]:
+            cycles += 1
+            position = start
+            while not seen[position]:
+                seen[position] = True
+                position = tiles[position]
+    parity = len(tiles) - cycles
+    if layout.cols % 2 == 0:
+        parity += layout.rows - 1 - puzzle.blank // layout.cols
+    return parity % 2 == 0
+
+
+def createRandomSlidingPuzzle(rows, cols, moves=100, seed=None):
+    """Creates a random puzzle by applying random moves to the goal; see createRandomFifteenPuzzle."""
+    rng = random if seed is None else random.Random(seed)
+    puzzle = SlidingPuzzleState(rows, cols)
+    for _ in range(moves):
+        puzzle = puzzle.result(rng.choice(puzzle.legalMoves()))
+    return puzzle
+
+
+class TileCostHeuristic:
+    """
+    A heuristic summing a per-tile cost table of the state's layout, chosen
+    by attribute name. Like fifteenpuzzle.IncrementalHeuristic it offers
+    successorValue, so aStarSearch derives a successor's value from its
+    parent's with two table lookups.
+    """
+
+    def __init__(self, tableName):
+        self.tableName = tableName
+
+    def __call__(self, state, problem=None):
+        costs = getattr(state.layout, self.tableName)
+        layout = state.layout
+        packed = state.packed
+        bits = layout.bits
+        mask = layout.mask
+        return sum(costs[(packed >> (bits * cell)) & mask][cell] for cell in range(layout.size))
+
+    def successorValue(self, value, state, action, successor):
+        """The tile that slid moved from the successor's blank cell to the parent's."""
+        layout = state.layout
+        costs = getattr(layout, self.tableName)
+        tile = (successor.packed >> (layout.bits * state.blank)) & layout.mask
+        return value + costs[tile][state.blank] - costs[tile][successor.blank]
+
+misplacedTiles = TileCostHeuristic('misplacedCosts')
+manhattanDistance = TileCostHeuristic('manhattanCosts')
+
+def linearConflict(state, problem=None):
+    """
+    Returns the Manhattan distance plus the linear-conflict penalty of every
+    row and column, as fifteenpuzzle.h6 does for the 4x4 board.
+    """
+    layout = state.layout
+    rows = layout.rows
+    cols = layout.cols
+    goalRows = layout.goalRows
+    goalCols = layout.goalCols
+    numbers = state.numbers()
+    total = manhattanDistance(state)
+    for row in range(rows):
+        tiles = numbers[row * cols:(row + 1) * cols]
+        total += _lineConflicts([goalCols[t] for t in tiles if t and goalRows[t] == row])
+    for col in range(cols):
+        tiles = numbers[col::cols]
+        total += _lineConflicts([goalRows[t] for t in tiles if t and goalCols[t] == col])
+    return total
+
+
+if __name__ == '__main__':
+    puzzle = createRandomSlidingPuzzle(5, 5, 60)
+    print('A random 24-puzzle:')
+    print(puzzle)
+    path, expanded_nodes, max_fringe_size = search.idaStarSearch(SlidingPuzzleSearchProblem(puzzle), linearConflict)
+    print('IDA* found a path of %d moves after %d expansions: %s' % (len(path), expanded_nodes, moveNames(path)))
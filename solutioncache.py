@@ -0,0 +1,111 @@
+"""
+A persistent cache of Fifteen Puzzle solutions.
+
+Solutions are stored in SQLite, keyed by the packed 64-bit board, as a blob
+of move codes. A board and its reflection in the main diagonal (see
+fifteenpuzzle.reflectPacked) share one entry, stored under the smaller of
+the two packed values: a hit on the mirrored board has its moves reflected
+on the way out. Recently used entries are also kept in an in-memory LRU, so
+repeated boards in a batch cost a dict lookup.
+
+SQLite runs in WAL mode, so the pool workers of automate.py can each open
+the same file and read and write it concurrently.
+"""
+
+import sqlite3
+from collections import OrderedDict
+from fifteenpuzzle import FifteenPuzzleState, REFLECTED_MOVE_CODES, reflectPacked
+
+DEFAULT_CAPACITY = 4096  # entries held in memory
+
+
+def canonicalBoard(packed):
+    """Returns (key, reflected): the smaller of a board and its mirror image, and whether that is the mirror."""
+    reflected = reflectPacked(packed)
+    if reflected < packed:
+        return reflected, True
+    return packed, False
+
+
+def _signed(packed):
+    """SQLite integers are signed 64-bit; boards with a high tile in the last cell wrap around."""
+    return packed - (1 << 64) if packed >= 1 << 63 else packed
+
+
+class SolutionCache:
+    """
+    Maps boards, given as states or packed integers, to solution paths of
+    move codes. get returns None on a miss; put stores a path found for a
+    board unless a shorter one is already stored. Unsolved boards (timeouts,
+    unsolvable boards) are never stored.
+    """
+
+    def __init__(self, filename, capacity=DEFAULT_CAPACITY):
+        self.filename = filename
+        self.capacity = capacity
+        self.memory = OrderedDict()  # canonical key -> bytes of move codes
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(filename, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS solutions (board INTEGER PRIMARY KEY, moves BLOB NOT NULL)")
+        self.connection.commit()
+
+    def _remember(self, key, moves):
+        memory = self.memory
+        memory[key] = moves
+        memory.move_to_end(key)
+        if len(memory) > self.capacity:
+            memory.popitem(last=False)
+
+    def get(self, puzzle):
+        """Returns a cached solution for the board as a list of move codes, or None."""
+        packed = puzzle.packed if isinstance(puzzle, FifteenPuzzleState) else puzzle
+        key, reflected = canonicalBoard(packed)
+        moves = self.memory.get(key)
+        if moves is not None:
+            self.memory.move_to_end(key)
+        else:
+            row = self.connection.execute(
+                "SELECT moves FROM solutions WHERE board = ?", (_signed(key),)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            moves = bytes(row[0])
+            self._remember(key, moves)
+        self.hits += 1
+        if reflected:
+            return [REFLECTED_MOVE_CODES[move] for move in moves]
+        return list(moves)
+
+    def put(self, puzzle, path):
+        """Stores a solution path, given as move codes, for the board."""
+        packed = puzzle.packed if isinstance(puzzle, FifteenPuzzleState) else puzzle
+        key, reflected = canonicalBoard(packed)
+        if reflected:
+            path = [REFLECTED_MOVE_CODES[move] for move in path]
+        moves = bytes(path)
+        known = self.memory.get(key)
+        if known is None or len(moves) < len(known):
+            self._remember(key, moves)
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO solutions (board, moves) VALUES (?, ?) ON CONFLICT (board) DO UPDATE "
+                "SET moves = excluded.moves WHERE length(excluded.moves) < length(solutions.moves)",
+                (_signed(key), moves))
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def statistics(self):
+        return {'hits': self.hits, 'misses': self.misses, 'memory': len(self.memory)}
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
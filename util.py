@@ -30,6 +30,8 @@ from lib2to3.fixes import fix_input
 import sys
 import inspect
 import heapq, random
+from array import array
+from collections import deque
 from io import StringIO
 
 class FixedRandom:
@@ -149,53 +151,106 @@ class Stack:
         "Returns true if the stack is empty"
         return len(self.list) == 0
 
+    def __len__(self):
+        return len(self.list)
+
 class Queue:
     "A container with a first-in-first-out (FIFO) queuing policy."
     def __init__(self):
-        self.list = []
+        self.list = deque()
 
     def push(self,item):
         "Enqueue the 'item' into the queue"
-        self.list.insert(0,item)
+        self.list.append(item)
 
     def pop(self):
         """
           Dequeue the earliest enqueued item still in the queue. This
           operation removes the item from the queue.
         """
-        return self.list.pop()
+        return self.list.popleft()
 
     def isEmpty(self):
         "Returns true if the queue is empty"
         return len(self.list) == 0
 
+    def __len__(self):
+        return len(self.list)
+
+_INVALIDATED = object()  # Marks a PriorityQueue entry superseded by update()
+
 class PriorityQueue:
     """
       Implements a priority queue data structure. Each inserted item
       has a priority associated with it and the client is usually interested
       in quick retrieval of the lowest-priority item in the queue. This
       data structure allows O(1) access to the lowest-priority item.
+
+      In indexed mode every pushed item is also recorded in a dict, and
+      update() invalidates the item's old entry in place and pushes a new
+      one, so it costs O(log n) instead of a linear scan and a re-heapify.
+      Invalidated entries are discarded as they reach the top of the heap.
+      Items must then be hashable.
     """
-    def  __init__(self):
+    def  __init__(self, indexed=False):
         self.heap = []
         self.count = 0
+        self.entries = {} if indexed else None
+        self.invalidated = 0  # invalidated entries still in the heap
 
     def push(self, item, priority):
-        entry = (priority, self.count, item)
-        heapq.heappush(self.heap, entry)
+        if self.entries is None:
+            heapq.heappush(self.heap, (priority, self.count, item))
+        else:
+            entry = [priority, self.count, item]
+            self.entries[item] = entry
+            heapq.heappush(self.heap, entry)
         self.count += 1
 
     def pop(self):
-        (_, _, item) = heapq.heappop(self.heap)
+        if self.entries is None:
+            (_, _, item) = heapq.heappop(self.heap)
+            return item
+        self._discardInvalidated()
+        entry = heapq.heappop(self.heap)
+        item = entry[2]
+        if self.entries.get(item) is entry:
+            del self.entries[item]
         return item
 
     def isEmpty(self):
+        if self.entries is not None:
+            self._discardInvalidated()
         return len(self.heap) == 0
 
+    def __len__(self):
+        "The number of items in the queue, not counting invalidated entries"
+        return len(self.heap) - self.invalidated
+
+    def _discardInvalidated(self):
+        heap = self.heap
+        while heap and heap[0][2] is _INVALIDATED:
+            heapq.heappop(heap)
+            self.invalidated -= 1
+
     def update(self, item, priority):
         # If item already in priority queue with higher priority, update its priority and rebuild the heap.
         # If item already in priority queue with equal or lower priority, do nothing.
         # If item not in priority queue, do the same thing as self.push.
+        if self.entries is not None:
+            entry = self.entries.get(item)
+            if entry is not None:
+                if entry[0] <= priority:
+                    return
+                # Reuse the count so ties still break by first insertion.
+                entry[2] = _INVALIDATED
+                self.invalidated += 1
+                entry = [priority, entry[1], item]
+                self.entries[item] = entry
+                heapq.heappush(self.heap, entry)
+            else:
+                self.push(item, priority)
+            return
         for index, (p, c, i) in enumerate(self.heap):
             if i == item:
                 if p <= priority:
@@ -207,6 +262,64 @@ class PriorityQueue:
         else:
             self.push(item, priority)
 
+class BucketPriorityQueue:
+    """
+      A priority queue for non-negative integer priorities, such as the
+      f-values of unit-cost searches with integer heuristics. Every priority
+      has its own bucket, so push is O(1) and pop is O(1) apart from the
+      scan past emptied buckets, which only moves forward between pushes of
+      smaller priorities. Items of equal priority are popped last-in-first-out,
+      which favours the deepest nodes of an A* f-layer.
+
+      Pushing a priority that is not an int raises TypeError; use
+      asPriorityQueue() to carry on with a heap-based queue.
+    """
+    def __init__(self):
+        self.buckets = []
+        self.minimum = 0
+        self.size = 0
+        self.count = 0
+
+    def push(self, item, priority):
+        if priority.__class__ is not int:
+            raise TypeError("BucketPriorityQueue needs int priorities, got %r" % (priority,))
+        if priority < 0:
+            raise ValueError("BucketPriorityQueue needs non-negative priorities")
+        buckets = self.buckets
+        while len(buckets) <= priority:
+            buckets.append([])
+        buckets[priority].append(item)
+        if priority < self.minimum:
+            self.minimum = priority
+        self.size += 1
+        self.count += 1
+
+    def pop(self):
+        if self.size == 0:
+            raise IndexError("pop from an empty priority queue")
+        buckets = self.buckets
+        minimum = self.minimum
+        while not buckets[minimum]:
+            minimum += 1
+        self.minimum = minimum
+        self.size -= 1
+        return buckets[minimum].pop()
+
+    def isEmpty(self):
+        return self.size == 0
+
+    def __len__(self):
+        return self.size
+
+    def asPriorityQueue(self):
+        "Returns a PriorityQueue holding the same items and priorities"
+        queue = PriorityQueue()
+        for priority, bucket in enumerate(self.buckets):
+            for item in bucket:
+                queue.push(item, priority)
+        queue.count = self.count
+        return queue
+
 class PriorityQueueWithFunction(PriorityQueue):
     """
     Implements a priority queue with the same push/pop signature of the
@@ -224,6 +337,107 @@ class PriorityQueueWithFunction(PriorityQueue):
         PriorityQueue.push(self, item, self.priorityFunction(item))
 
 
+class ExactClosedSet:
+    """
+      The closed set of a graph search: remembers every state added to it.
+      If a key function is given (e.g. a problem's getStateKey, returning a
+      packed integer) only the keys are stored, not the states themselves.
+      Keeps the same hit/collision/eviction counters as TranspositionTable,
+      the last two always zero.
+    """
+    def __init__(self, key=None):
+        self.key = key
+        self.keys = set()
+        self.hits = 0
+        self.collisions = 0
+        self.evictions = 0
+
+    def add(self, state, depth=0):
+        self.keys.add(state if self.key is None else self.key(state))
+
+    def __contains__(self, state):
+        if (state if self.key is None else self.key(state)) in self.keys:
+            self.hits += 1
+            return True
+        return False
+
+    def __len__(self):
+        return len(self.keys)
+
+    def statistics(self):
+        "Returns a dict of entry count and hit/collision/eviction counters"
+        return {'entries': len(self), 'hits': self.hits,
+                'collisions': self.collisions, 'evictions': self.evictions}
+
+class TranspositionTable(ExactClosedSet):
+    """
+      A closed set of fixed size in megabytes. Each state hashes to a single
+      slot holding a 64-bit key and a depth, so memory never grows; when two
+      states want the same slot the replacement policy decides which stays:
+
+        'always-replace'  the newest state takes the slot
+        'depth-preferred' the state with the smaller depth (nearer the start,
+                          where a repeat would prune the most) keeps it
+
+      A forgotten state is simply searched again, so a search degrades by
+      re-expanding nodes rather than running out of memory. Only the closed
+      set is bounded: a search's fringe and any tables of its own, such as
+      aStarSearch's best costs and parents, still grow. Keys should be
+      integers below 2**64, such as packed states; other keys are stored as
+      their 64-bit hash, which makes false hits possible.
+    """
+    ENTRY_BYTES = 11  # 8-byte key, 2-byte depth, 1 occupied flag
+
+    def __init__(self, megabytes=64, policy='depth-preferred', key=None):
+        if policy not in ('always-replace', 'depth-preferred'):
+            raise ValueError("Unknown replacement policy: %s" % policy)
+        ExactClosedSet.__init__(self, key)
+        self.keys = None
+        self.policy = policy
+        self.size = max(1, int(megabytes * (1 << 20)) // self.ENTRY_BYTES)
+        self.slotKeys = array('Q', bytes(8 * self.size))
+        self.depths = array('H', bytes(2 * self.size))
+        self.occupied = bytearray(self.size)
+        self.entries = 0
+
+    def _fingerprint(self, state):
+        key = state if self.key is None else self.key(state)
+        if key.__class__ is not int or not 0 <= key < (1 << 64):
+            key = hash(key) & 0xFFFFFFFFFFFFFFFF
+        return key
+
+    def _slot(self, key):
+        return ((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) % self.size
+
+    def add(self, state, depth=0):
+        key = self._fingerprint(state)
+        slot = self._slot(key)
+        depth = int(min(depth, 0xFFFF))
+        if self.occupied[slot]:
+            if self.slotKeys[slot] == key:
+                self.depths[slot] = min(self.depths[slot], depth)
+                return
+            self.collisions += 1
+            if self.policy == 'depth-preferred' and self.depths[slot] < depth:
+                return
+            self.evictions += 1
+        else:
+            self.occupied[slot] = 1
+            self.entries += 1
+        self.slotKeys[slot] = key
+        self.depths[slot] = depth
+
+    def __contains__(self, state):
+        key = self._fingerprint(state)
+        slot = self._slot(key)
+        if self.occupied[slot] and self.slotKeys[slot] == key:
+            self.hits += 1
+            return True
+        return False
+
+    def __len__(self):
+        return self.entries
+
 def manhattanDistance( xy1, xy2 ):
     "Returns the Manhattan distance between points xy1 and xy2"
     return abs( xy1[0] - xy2[0] ) + abs( xy1[1] - xy2[1] )
@@ -615,6 +829,11 @@ class TimeoutFunctionException(Exception):
     pass
 
 
+class NodeLimitException(TimeoutFunctionException):
+    """Exception to raise when a search expands more nodes than allowed"""
+    pass
+
+
 class TimeoutFunction:
     def __init__(self, function, timeout):
         self.timeout = timeout